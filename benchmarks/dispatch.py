@@ -0,0 +1,98 @@
+"""
+Measure guild message throughput through every GuildMessageCreateEvent
+listener, including tanjun dependency injection, using one non-matching
+human message.
+
+Run from the repository root: python -m benchmarks.dispatch
+
+The figures quoted for the dispatcher were taken by running this against
+the commit before and after it was introduced.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+import tanjun
+from hikari import GatewayBot, GuildMessageCreateEvent, Snowflake
+from loguru import logger
+
+import components
+
+events: int = 20000
+
+
+def Event() -> SimpleNamespace:
+    """Build a stand-in guild message event from a human author."""
+
+    author: SimpleNamespace = SimpleNamespace(
+        id=Snowflake(999), is_bot=False, is_system=False
+    )
+    message: SimpleNamespace = SimpleNamespace(
+        content="hello there this is a normal message without keywords",
+        channel_id=Snowflake(7),
+        user_mentions_ids=[Snowflake(5)],
+        member=SimpleNamespace(id=author.id, role_ids=[Snowflake(10)]),
+        attachments=[],
+    )
+
+    return SimpleNamespace(
+        author=author,
+        author_id=author.id,
+        is_human=True,
+        channel_id=message.channel_id,
+        guild_id=Snowflake(8),
+        message_id=Snowflake(9),
+        message=message,
+    )
+
+
+async def Main() -> None:
+    """Dispatch the same event repeatedly and report events per second."""
+
+    logger.remove()
+
+    with open("config_example.json", "r") as file:
+        data: Dict[str, Any] = json.loads(file.read())
+
+    client: tanjun.Client = tanjun.Client(rest=mock.AsyncMock(), events=None)
+
+    client.set_type_dependency(Dict[str, Any], data)
+    client.set_type_dependency(tanjun.Client, client)
+    client.set_type_dependency(GatewayBot, mock.Mock(spec=GatewayBot))
+
+    # Trees before the configuration model existed inject the raw values
+    try:
+        from models import Config
+
+        client.set_type_dependency(Config, Config.Parse(data))
+    except ImportError:
+        pass
+
+    listeners: List[Callable] = []
+
+    for name in dir(components):
+        if isinstance(component := getattr(components, name), tanjun.Component):
+            listeners += component.listeners.get(GuildMessageCreateEvent, [])
+
+    event: SimpleNamespace = Event()
+    start: float = time.perf_counter()
+
+    for _ in range(events):
+        await asyncio.gather(
+            *[
+                client.injector.call_with_async_di(listener, event)
+                for listener in listeners
+            ]
+        )
+
+    elapsed: float = time.perf_counter() - start
+
+    print(f"{len(listeners):,} listeners  {events / elapsed:,.0f} events/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(Main())
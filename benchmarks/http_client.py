@@ -0,0 +1,63 @@
+"""
+Compare a fresh httpx client per request with the shared client behind
+Utility.GET() using 500 sequential requests to a local stand-in server.
+
+Run from the repository root: python -m benchmarks.http_client
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+from httpx import AsyncClient
+from loguru import logger
+
+from helpers import Utility
+
+requests: int = 500
+
+
+async def Main() -> None:
+    """Time both clients against the same local JSON endpoint."""
+
+    logger.remove()
+
+    app: web.Application = web.Application()
+    app.router.add_get("/", lambda request: web.json_response({"url": "example"}))
+
+    runner: web.AppRunner = web.AppRunner(app)
+
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8765).start()
+
+    url: str = "http://127.0.0.1:8765/"
+
+    try:
+        start: float = time.perf_counter()
+
+        for _ in range(requests):
+            async with AsyncClient() as http:
+                (await http.get(url)).json()
+
+        print(
+            f"per-call client  {(time.perf_counter() - start) * 1000 / requests:,.2f} ms/request"
+        )
+
+        # Warm the shared client's connection pool
+        await Utility.GET(url)
+
+        start = time.perf_counter()
+
+        for _ in range(requests):
+            await Utility.GET(url)
+
+        print(
+            f"shared client    {(time.perf_counter() - start) * 1000 / requests:,.2f} ms/request"
+        )
+    finally:
+        await Utility.CloseHTTP()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(Main())
@@ -0,0 +1,67 @@
+"""
+Compare the former linear keyword scan with Utility.FindKeywords() using
+1,000 keywords (100 of them two-word phrases) against 10,000 messages.
+
+Run from the repository root: python -m benchmarks.keywords
+"""
+
+import random
+import time
+from typing import List
+
+from loguru import logger
+
+from helpers import Utility
+
+
+def LinearScan(content: str, keywords: List[str]) -> List[str]:
+    """Find keywords by checking each against the message's word list."""
+
+    words: List[str] = [word.lower() for word in content.split()]
+
+    return [keyword for keyword in keywords if keyword in words]
+
+
+def Main() -> None:
+    """Time both matchers against the same generated keywords and messages."""
+
+    logger.remove()
+    random.seed(1)
+
+    vocabulary: List[str] = [
+        "".join(
+            random.choice("abcdefghijklmnopqrstuvwxyz")
+            for _ in range(random.randint(3, 9))
+        )
+        for _ in range(5000)
+    ]
+    keywords: List[str] = random.sample(vocabulary, 900) + [
+        " ".join(random.sample(vocabulary, 2)) for _ in range(100)
+    ]
+    messages: List[str] = [
+        " ".join(
+            random.choice(vocabulary) + random.choice(["", "", ",", "!"])
+            for _ in range(random.randint(5, 30))
+        )
+        for _ in range(10000)
+    ]
+
+    start: float = time.perf_counter()
+    found: int = sum(len(LinearScan(message, keywords)) for message in messages)
+
+    print(
+        f"linear scan     {(time.perf_counter() - start) * 1000:,.0f} ms ({found:,} matches)"
+    )
+
+    lowered: List[str] = [message.lower() for message in messages]
+
+    start = time.perf_counter()
+    found = sum(len(Utility.FindKeywords(message, keywords)) for message in lowered)
+
+    print(
+        f"compiled index  {(time.perf_counter() - start) * 1000:,.0f} ms ({found:,} matches)"
+    )
+
+
+if __name__ == "__main__":
+    Main()
@@ -1,6 +1,7 @@
 # ruff: noqa: F401
 from .admin import component as Admin
 from .animals import component as Animals
+from .dispatch import component as Dispatch
 from .food import component as Food
 from .logs import component as Logs
 from .messages import component as Messages
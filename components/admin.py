@@ -29,7 +29,8 @@ from tanjun.abc import SlashContext
 from tanjun.commands import SlashCommandGroup
 
 from helpers import Responses, Timestamps
-from models import State
+from models import Config, State
+from services import Reddit, Registry, Webhooks
 
 component: Component = Component(name="Admin")
 
@@ -51,7 +52,7 @@ async def CommandUnban(
     user: Union[InteractionMember, UserImpl],
     reason: str,
     client: Client = tanjun.inject(type=Client),
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    config: Config = tanjun.inject(type=Config),
 ) -> None:
     """Handler for the /unban slash command."""
 
@@ -84,7 +85,7 @@ async def CommandUnban(
         return
 
     await client.rest.create_message(
-        config["channels"]["moderation"],
+        config.channels.moderation,
         Responses.Log(
             "hammer",
             f"{Responses.ExpandUser(user)} unbanned by {Responses.ExpandUser(ctx.author)} with reason: *{reason}*",
@@ -310,6 +311,48 @@ async def CommandStatus(
     )
     stats.append({"name": "Guild Shard", "value": f"{guild.shard_id:,}"})
 
+    reddit: Dict[str, Any] = Reddit.AuthStats(state.botStart)
+
+    stats.append(
+        {
+            "name": "Reddit Auth",
+            "value": f"{reddit['authentications']:,} grants ({reddit['savedPerHour']:,.1f} saved/hr)",
+        }
+    )
+
+    webhooks: Dict[str, int] = Webhooks.Stats()
+
+    stats.append(
+        {
+            "name": "Webhooks",
+            "value": f"{webhooks['delivered']:,} delivered, {webhooks['pending']:,} pending, {webhooks['dropped']:,} dropped",
+        }
+    )
+
+    sources: List[Dict[str, Any]] = Registry.Stats()
+    unhealthy: List[str] = []
+
+    for source in sorted(sources, key=lambda x: x["errorRate"], reverse=True):
+        if (source["state"] == "closed") and (source["errorRate"] < 0.25):
+            continue
+
+        p95: str = "N/A" if source["p95"] is None else f"{source['p95']:,.2f}s"
+
+        unhealthy.append(
+            f"`{source['name']}` {source['state']}, {source['errorRate']:.0%} errors, p95 {p95}"
+        )
+
+    stats.append(
+        {
+            "name": "Image Sources",
+            "value": "\n".join(
+                [f"{len(sources) - len(unhealthy):,}/{len(sources):,} healthy"]
+                + unhealthy[:10]
+            ),
+            "inline": len(unhealthy) == 0,
+        }
+    )
+
     stats.append(
         {
             "name": "Python",
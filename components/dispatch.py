@@ -0,0 +1,52 @@
+from typing import Awaitable, Callable, List
+
+import tanjun
+from hikari.events.message_events import GuildMessageCreateEvent
+from loguru import logger
+from tanjun import Client, Component
+
+from models import Config, MessageFacts
+
+from .logs import EventKeyword, EventMention, EventMirror
+from .messages import EventShadowban
+from .roles import EventValidateRoles
+
+component: Component = Component(name="Dispatch")
+
+Handler = Callable[
+    [GuildMessageCreateEvent, MessageFacts, Client, Config], Awaitable[None]
+]
+
+# Guild message handlers, split by whether or not the author is a human
+humanHandlers: List[Handler] = [
+    EventShadowban,
+    EventKeyword,
+    EventMention,
+    EventValidateRoles,
+]
+botHandlers: List[Handler] = [EventMirror]
+
+
+@component.with_listener(GuildMessageCreateEvent)
+async def EventGuildMessage(
+    ctx: GuildMessageCreateEvent,
+    client: Client = tanjun.inject(type=Client),
+    config: Config = tanjun.inject(type=Config),
+) -> None:
+    """
+    Determine the shared facts of a guild message once, then dispatch it
+    to the message handlers of each component.
+
+    Handlers are awaited in order rather than as separate tasks, as nearly
+    every message is rejected by their initial checks without awaiting.
+    """
+
+    facts: MessageFacts = MessageFacts.From(ctx, config)
+
+    for handler in humanHandlers if facts.human else botHandlers:
+        try:
+            await handler(ctx, facts, client, config)
+        except Exception as e:
+            logger.opt(exception=e).error(
+                f"Failed to handle guild message {ctx.message_id} in {handler.__name__}"
+            )
@@ -1,6 +1,5 @@
-import asyncio
 import random
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import tanjun
 from hikari import Permissions
@@ -9,20 +8,64 @@ from tanjun import Component
 from tanjun.abc import SlashContext
 
 from helpers import Responses
-from services import Burger, Dessert, HotDog, Pasta, Pizza, Salad, Sandwich, Sushi, Taco
+from models import Config
+from services import (
+    Burger,
+    Dessert,
+    HotDog,
+    Pasta,
+    Pizza,
+    Registry,
+    Salad,
+    Sandwich,
+    Sushi,
+    Taco,
+)
+from services.registry import Source
 
 component: Component = Component(name="Food")
-foodTypes: List[str] = [
-    "Burger",
-    "Dessert",
-    "Hot Dog",
-    "Pasta",
-    "Pizza",
-    "Salad",
-    "Sandwich",
-    "Sushi",
-    "Taco",
-]
+foodTypes: Dict[str, List[Source]] = {
+    "Burger": [Burger.RedditBurgers],
+    "Dessert": [
+        Dessert.RedditCake,
+        Dessert.RedditCookies,
+        Dessert.RedditCupcakes,
+        Dessert.RedditDessert,
+        Dessert.RedditDessertPorn,
+        Dessert.RedditIcecreamery,
+        Dessert.RedditPie,
+    ],
+    "Hot Dog": [HotDog.RedditHotDogs],
+    "Pasta": [Pasta.RedditPasta],
+    "Pizza": [Pizza.RedditPizza],
+    "Salad": [Salad.RedditSalads],
+    "Sandwich": [
+        Sandwich.RedditEatSandwiches,
+        Sandwich.RedditGrilledCheese,
+        Sandwich.RedditSandwiches,
+    ],
+    "Sushi": [Sushi.RedditSushi],
+    "Taco": [Taco.RedditTacos],
+}
+
+for food, sources in foodTypes.items():
+    Registry.Register(food, sources)
+
+
+@component.with_client_callback(tanjun.ClientCallbackNames.STARTED)
+async def StartBuffers(
+    config: Config = tanjun.inject(type=Config),
+) -> None:
+    """Begin prefetching results for each food type."""
+
+    Registry.StartProducer(list(foodTypes), config)
+
+
+@component.with_client_callback(tanjun.ClientCallbackNames.CLOSING)
+async def StopBuffers() -> None:
+    """Stop prefetching results for each food type."""
+
+    await Registry.StopProducers()
 
 
 @component.with_slash_command()
@@ -30,7 +73,7 @@ foodTypes: List[str] = [
 @tanjun.with_str_slash_option(
     "type",
     "Choose a food type or leave empty for random.",
-    choices=foodTypes,
+    choices=list(foodTypes),
     default=None,
 )
 @tanjun.as_slash_command("food", "Fetch a random picture of food.")
@@ -38,56 +81,12 @@ async def CommandFood(ctx: SlashContext, type: Optional[str]) -> None:
     """Handler for the /food command."""
 
     if type is None:
-        type = random.choice(foodTypes)
+        type = random.choice(list(foodTypes))
 
-    result: Optional[Embed] = None
-    source: int = 1
+    result: Optional[Embed] = Registry.Take(type)
     retries: int = 0
 
     while result is None:
-        if type == "Burger":
-            result = await Burger.RedditBurgers()
-        elif type == "Dessert":
-            source = random.randint(1, 7)
-
-            if source == 1:
-                result = await Dessert.RedditCake()
-            elif source == 2:
-                result = await Dessert.RedditCookies()
-            elif source == 3:
-                result = await Dessert.RedditCupcakes()
-            elif source == 4:
-                result = await Dessert.RedditDessert()
-            elif source == 5:
-                result = await Dessert.RedditDessertPorn()
-            elif source == 6:
-                result = await Dessert.RedditIcecreamery()
-            elif source == 7:
-                result = await Dessert.RedditPie()
-        elif type == "Hot Dog":
-            result = await HotDog.RedditHotDogs()
-        elif type == "Pasta":
-            result = await Pasta.RedditPasta()
-        elif type == "Pizza":
-            result = await Pizza.RedditPizza()
-        elif type == "Salad":
-            result = await Salad.RedditSalads()
-        elif type == "Sandwich":
-            source = random.randint(1, 3)
-
-            if source == 1:
-                result = await Sandwich.RedditEatSandwiches()
-            if source == 2:
-                result = await Sandwich.RedditGrilledCheese()
-            elif source == 3:
-                result = await Sandwich.RedditSandwiches()
-        elif type == "Sushi":
-            result = await Sushi.RedditSushi()
-        elif type == "Taco":
-            result = await Taco.RedditTacos()
-
-        retries += 1
-
         if retries >= 3:
             await ctx.respond(
                 embed=Responses.Fail(
@@ -97,7 +96,8 @@ async def CommandFood(ctx: SlashContext, type: Optional[str]) -> None:
 
             return
 
-        # Sleep to prevent rate-limiting
-        await asyncio.sleep(float(1))
+        result = await Registry.Fetch(type)
+
+        retries += 1
 
     await ctx.respond(embed=result)
@@ -1,5 +1,8 @@
+import asyncio
+import gzip
 from os import environ
-from typing import Any, Dict, List, Optional
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Dict, List, Optional, Tuple
 
 import tanjun
 from hikari.events.message_events import (
@@ -12,20 +15,35 @@ from tanjun import Client, Component
 from urlextract import URLExtract
 
 from helpers import Responses, Utility
+from models import Config, MessageFacts
+from services import Webhooks
 
 component: Component = Component(name="Logs")
 
+# Built once from the TLD list bundled with urlextract, which is never
+# refreshed over the network, see EventMirror()
+extractor: URLExtract = URLExtract(cache_dns=False)
+
+# Discord attachment size limit, larger archives are compressed or split
+uploadLimit: int = 10485760
+
+# Maximum size of a Zeppelin log archive to download and mirror
+archiveLimit: int = 104857600
+
+# Size at which archive buffers are moved from memory to disk
+spoolSize: int = 1048576
+
 
 @component.with_listener(DMMessageCreateEvent)
 async def EventDirectMessage(
     ctx: DMMessageCreateEvent,
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    config: Config = tanjun.inject(type=Config),
 ) -> None:
     """Handler for notifying of direct messages."""
 
-    if int(ctx.author.id) == config["users"]["bot"]:
+    if int(ctx.author.id) == config.users.bot:
         return
-    elif int(ctx.author.id) == config["users"]["owner"]:
+    elif int(ctx.author.id) == config.users.owner:
         return
 
     content: Optional[str] = None
@@ -34,112 +52,94 @@ async def EventDirectMessage(
         if ctx.message.content is not None:
             content = f">>> {Utility.Trim(ctx.message.content, 4000)}"
 
-    payload: Dict[str, Any] = {
-        "username": "N31L",
-        "avatar_url": "https://i.imgur.com/cGtkGuI.png",
-        "embeds": [
-            {
-                "title": "Direct Message",
-                "description": content,
-                "timestamp": ctx.message.timestamp.isoformat(),
-                "color": int("00FF00", base=16),
-                "footer": {"text": f"{ctx.author.id}"},
-                "author": {
-                    "name": Responses.ExpandUser(ctx.author, False, False),
-                    "icon_url": str(ctx.author.default_avatar_url)
-                    if (avatar := ctx.author.avatar_url) is None
-                    else str(avatar),
-                },
-                "fields": [],
-            }
-        ],
+    embed: Dict[str, Any] = {
+        "title": "Direct Message",
+        "description": content,
+        "timestamp": ctx.message.timestamp.isoformat(),
+        "color": int("00FF00", base=16),
+        "footer": {"text": f"{ctx.author.id}"},
+        "author": {
+            "name": Responses.ExpandUser(ctx.author, False, False),
+            "icon_url": str(ctx.author.default_avatar_url)
+            if (avatar := ctx.author.avatar_url) is None
+            else str(avatar),
+        },
+        "fields": [],
     }
 
     for attachment in ctx.message.attachments:
-        payload["embeds"][0]["fields"].append(
+        embed["fields"].append(
             {
                 "name": "Attachment",
                 "value": f"[`{attachment.filename}` (`{attachment.media_type}`)]({attachment.url})",
             }
         )
 
-    status: bool = await Utility.POST(environ.get("LOG_DISCORD_WEBHOOK_URL"), payload)
-
-    if status is not True:
-        return
+    Webhooks.Enqueue(environ.get("LOG_DISCORD_WEBHOOK_URL"), embed)
 
     logger.info(
         f"Received direct message from {Responses.ExpandUser(ctx.author, False)}"
     )
 
 
-@component.with_listener(GuildMessageCreateEvent)
 async def EventKeyword(
     ctx: GuildMessageCreateEvent,
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    facts: MessageFacts,
+    client: Client,
+    config: Config,
 ) -> None:
     """Handler for notifying of keyword mentions."""
 
-    if ctx.author.is_bot:
+    if facts.bot:
         return
-    elif ctx.author.is_system:
+    elif facts.system:
         return
-    elif ctx.author.id == config["users"]["owner"]:
+    elif facts.owner:
         return
-    elif ctx.message.channel_id in config["logging"]["kwIgnore"]:
+    elif facts.channelId in config.logging.kwIgnore:
         return
-    elif ctx.message.content is None:
+    elif facts.lowered is None:
         return
 
-    words: List[str] = [word.lower() for word in ctx.message.content.split()]
-    found: List[str] = []
-
-    for keyword in config["logging"]["keywords"]:
-        if keyword not in words:
-            continue
-
-        found.append(f"`{keyword}`")
+    found: List[str] = [
+        f"`{keyword}`"
+        for keyword in Utility.FindKeywords(facts.lowered, config.logging.keywords)
+    ]
 
     if len(found) == 0:
         return
 
-    payload: Dict[str, Any] = {
-        "username": "N31L",
-        "avatar_url": "https://i.imgur.com/cGtkGuI.png",
-        "embeds": [
+    embed: Dict[str, Any] = {
+        "title": ("Keyword" if len(found) == 1 else "Keywords") + " Mention",
+        "description": f">>> {Utility.Trim(ctx.message.content, 4000)}",
+        "url": f"https://discord.com/channels/{ctx.guild_id}/{ctx.channel_id}/{ctx.message_id}",
+        "timestamp": ctx.message.timestamp.isoformat(),
+        "color": int("00FF00", base=16),
+        "footer": {"text": f"{ctx.author.id}"},
+        "author": {
+            "name": Responses.ExpandUser(ctx.author, False, False),
+            "icon_url": str(ctx.author.default_avatar_url)
+            if (avatar := ctx.author.avatar_url) is None
+            else str(avatar),
+        },
+        "fields": [
             {
-                "title": ("Keyword" if len(found) == 1 else "Keywords") + " Mention",
-                "description": f">>> {Utility.Trim(ctx.message.content, 4000)}",
-                "url": f"https://discord.com/channels/{ctx.guild_id}/{ctx.channel_id}/{ctx.message_id}",
-                "timestamp": ctx.message.timestamp.isoformat(),
-                "color": int("00FF00", base=16),
-                "footer": {"text": f"{ctx.author.id}"},
-                "author": {
-                    "name": Responses.ExpandUser(ctx.author, False, False),
-                    "icon_url": str(ctx.author.default_avatar_url)
-                    if (avatar := ctx.author.avatar_url) is None
-                    else str(avatar),
-                },
-                "fields": [
-                    {
-                        "name": "Keyword" if len(found) == 1 else "Keywords",
-                        "value": ", ".join(found),
-                        "inline": True,
-                    },
-                    {
-                        "name": "Channel",
-                        "value": "Unknown"
-                        if not (chan := ctx.get_channel())
-                        else f"`#{chan.name}`",
-                        "inline": True,
-                    },
-                ],
-            }
+                "name": "Keyword" if len(found) == 1 else "Keywords",
+                "value": ", ".join(found),
+                "inline": True,
+            },
+            {
+                "name": "Channel",
+                "value": "Unknown"
+                if not (chan := ctx.get_channel())
+                else f"`#{chan.name}`",
+                "inline": True,
+            },
         ],
     }
 
     for attachment in ctx.message.attachments:
-        payload["embeds"][0]["fields"].append(
+        embed["fields"].append(
             {
                 "name": "Attachment",
                 "value": f"[`{attachment.filename}`]({attachment.url})",
@@ -147,80 +147,70 @@ async def EventKeyword(
             }
         )
 
-    status: bool = await Utility.POST(environ.get("LOG_DISCORD_WEBHOOK_URL"), payload)
-
-    if status is not True:
-        return
+    Webhooks.Enqueue(environ.get("LOG_DISCORD_WEBHOOK_URL"), embed)
 
     logger.success(
         f"Notified of keyword ({found}) mention by {Responses.ExpandUser(ctx.author, False)} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(ctx.get_channel(), False)}"
     )
 
 
-@component.with_listener(GuildMessageCreateEvent)
 async def EventMention(
     ctx: GuildMessageCreateEvent,
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    facts: MessageFacts,
+    client: Client,
+    config: Config,
 ) -> None:
     """Handler for notifying of mentions."""
 
-    if ctx.author.is_bot:
+    if facts.bot:
         return
-    elif ctx.author.is_system:
+    elif facts.system:
         return
-    elif ctx.author.id == config["users"]["owner"]:
+    elif facts.owner:
         return
-    elif ctx.message.content is None:
+    elif facts.content is None:
+        return
+    elif len(facts.mentions) == 0:
         return
 
-    found: List[str] = []
-
-    for id in config["logging"]["mentions"]:
-        if id not in ctx.message.user_mentions_ids:
-            continue
-
-        found.append(f"<@{id}>")
+    found: List[str] = [
+        f"<@{id}>" for id in sorted(facts.mentions & config.logging.mentions)
+    ]
 
     if len(found) == 0:
         return
 
-    payload: Dict[str, Any] = {
-        "username": "N31L",
-        "avatar_url": "https://i.imgur.com/cGtkGuI.png",
-        "embeds": [
+    embed: Dict[str, Any] = {
+        "title": "Mention",
+        "description": f">>> {Utility.Trim(ctx.message.content, 4000)}",
+        "url": f"https://discord.com/channels/{ctx.guild_id}/{ctx.channel_id}/{ctx.message_id}",
+        "timestamp": ctx.message.timestamp.isoformat(),
+        "color": int("00FF00", base=16),
+        "footer": {"text": f"{ctx.author.id}"},
+        "author": {
+            "name": Responses.ExpandUser(ctx.author, False, False),
+            "icon_url": str(ctx.author.default_avatar_url)
+            if (avatar := ctx.author.avatar_url) is None
+            else str(avatar),
+        },
+        "fields": [
             {
-                "title": "Mention",
-                "description": f">>> {Utility.Trim(ctx.message.content, 4000)}",
-                "url": f"https://discord.com/channels/{ctx.guild_id}/{ctx.channel_id}/{ctx.message_id}",
-                "timestamp": ctx.message.timestamp.isoformat(),
-                "color": int("00FF00", base=16),
-                "footer": {"text": f"{ctx.author.id}"},
-                "author": {
-                    "name": Responses.ExpandUser(ctx.author, False, False),
-                    "icon_url": str(ctx.author.default_avatar_url)
-                    if (avatar := ctx.author.avatar_url) is None
-                    else str(avatar),
-                },
-                "fields": [
-                    {
-                        "name": "User" if len(found) == 1 else "Users",
-                        "value": ", ".join(found),
-                        "inline": True,
-                    },
-                    {
-                        "name": "Channel",
-                        "value": "Unknown"
-                        if not (chan := ctx.get_channel())
-                        else f"`#{chan.name}`",
-                        "inline": True,
-                    },
-                ],
-            }
+                "name": "User" if len(found) == 1 else "Users",
+                "value": ", ".join(found),
+                "inline": True,
+            },
+            {
+                "name": "Channel",
+                "value": "Unknown"
+                if not (chan := ctx.get_channel())
+                else f"`#{chan.name}`",
+                "inline": True,
+            },
         ],
     }
 
     for attachment in ctx.message.attachments:
-        payload["embeds"][0]["fields"].append(
+        embed["fields"].append(
             {
                 "name": "Attachment",
                 "value": f"[`{attachment.filename}`]({attachment.url})",
@@ -228,68 +218,184 @@ async def EventMention(
             }
         )
 
-    status: bool = await Utility.POST(environ.get("LOG_DISCORD_WEBHOOK_URL"), payload)
-
-    if status is not True:
-        return
+    Webhooks.Enqueue(environ.get("LOG_DISCORD_WEBHOOK_URL"), embed)
 
     logger.success(
         f"Notified of mention ({found}) by {Responses.ExpandUser(ctx.author, False)} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(ctx.get_channel(), False)}"
     )
 
 
-@component.with_listener(GuildMessageCreateEvent)
 async def EventMirror(
     ctx: GuildMessageCreateEvent,
-    client: Client = tanjun.inject(type=Client),
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    facts: MessageFacts,
+    client: Client,
+    config: Config,
 ) -> None:
     """Handler for automatically mirroring Zeppelin log archives."""
 
-    if int(ctx.channel_id) != config["channels"]["moderation"]:
+    if facts.channelId != config.channels.moderation:
         return
-    elif not ctx.author.is_bot:
+    elif not facts.bot:
         return
-    elif int(ctx.author.id) == config["users"]["bot"]:
+    elif facts.authorId == config.users.bot:
         return
-    elif not hasattr(ctx.message, "content"):
+    elif facts.lowered is None:
         return
-    elif ctx.message.content is None:
+    elif "api.zeppelin.gg/archives/" not in facts.lowered:
         return
 
-    content: str = ctx.message.content.lower()
-    urls: List[str] = []
-    extractor: URLExtract = URLExtract()
-
-    urls = extractor.find_urls(content, True)
+    content: str = facts.lowered
+    urls: List[str] = extractor.find_urls(content, True)
 
     logger.trace(content)
     logger.trace(urls)
 
-    for url in urls:
-        if not url.startswith("https://api.zeppelin.gg/archives/"):
-            continue
+    await asyncio.gather(
+        *[
+            MirrorArchive(ctx, client, config, url)
+            for url in urls
+            if url.startswith("https://api.zeppelin.gg/archives/")
+        ]
+    )
 
-        data: Optional[str] = await Utility.GET(url)
 
-        if data is None:
-            return
+async def MirrorArchive(
+    ctx: GuildMessageCreateEvent, client: Client, config: Config, url: str
+) -> None:
+    """
+    Stream the specified Zeppelin log archive into a spooled buffer and
+    reply to the provided message with it, compressed or split into
+    numbered parts as needed to fit the attachment size limit.
+    """
+
+    download: Optional[Tuple[SpooledTemporaryFile, int]] = await Utility.Download(
+        url, archiveLimit, spoolSize
+    )
 
-        result: str = Responses.Log("mirror", f"Mirror of Zeppelin log archive <{url}>")
-        filename: str = "archive"
+    if download is None:
+        return
 
-        try:
-            filename = url.split("/")[-1]
-        except Exception as e:
-            logger.opt(exception=e).warning(
-                "Failed to determine Zeppelin log archive filename"
-            )
+    data, size = download
+    filename: str = "archive"
+    parts: List[Tuple[str, IO[bytes]]] = []
 
-        await client.rest.create_message(
-            config["channels"]["moderation"],
-            result,
-            attachment=Bytes(data, f"{filename}.txt"),
-            reply=ctx.message,
+    try:
+        filename = url.split("/")[-1]
+    except Exception as e:
+        logger.opt(exception=e).warning(
+            "Failed to determine Zeppelin log archive filename"
         )
 
-        logger.success(f"Mirrored Zeppelin log archive {url}")
+    try:
+        parts = await asyncio.to_thread(PackArchive, data, size, filename)
+
+        for index, (name, part) in enumerate(parts, 1):
+            result: str = f"Mirror of Zeppelin log archive <{url}>"
+
+            if len(parts) > 1:
+                result += f" (part {index:,}/{len(parts):,})"
+
+            # Uploads are rebuilt when retried, so each part is read whole
+            # rather than streamed from the buffer.
+            part.seek(0)
+
+            await client.rest.create_message(
+                config.channels.moderation,
+                Responses.Log("mirror", result),
+                attachment=Bytes(part.read(), name),
+                reply=ctx.message,
+            )
+    except Exception as e:
+        logger.opt(exception=e).error(f"Failed to mirror Zeppelin log archive {url}")
+
+        return
+    finally:
+        data.close()
+
+        for _, part in parts:
+            part.close()
+
+    logger.success(
+        f"Mirrored Zeppelin log archive {url} ({size:,} bytes, {len(parts):,} parts)"
+    )
+
+
+def PackArchive(
+    data: IO[bytes], size: int, filename: str
+) -> List[Tuple[str, IO[bytes]]]:
+    """
+    Prepare the provided archive for upload, gzip-compressing it when it
+    exceeds the attachment size limit and splitting it on line boundaries
+    into separately compressed parts when that is still not enough.
+    """
+
+    if size <= uploadLimit:
+        return [(f"{filename}.txt", data)]
+
+    compressed, length = CompressLines(data, size)
+
+    if length <= uploadLimit:
+        return [(f"{filename}.txt.gz", compressed)]
+
+    compressed.close()
+
+    # Size each part from the overall compression ratio, leaving headroom
+    # for sections which compress worse than average.
+    budget: int = int(uploadLimit * (size / length) * 0.9)
+    parts: List[IO[bytes]] = []
+
+    data.seek(0)
+
+    while data.tell() < size:
+        start: int = data.tell()
+        part, length = CompressLines(data, budget)
+
+        if length > uploadLimit:
+            part.close()
+            data.seek(start)
+
+            budget //= 2
+
+            continue
+
+        parts.append(part)
+
+    return [
+        (f"{filename}.part{index}.txt.gz", part) for index, part in enumerate(parts, 1)
+    ]
+
+
+def CompressLines(data: IO[bytes], budget: int) -> Tuple[IO[bytes], int]:
+    """
+    Compress from the current position of the provided buffer until the
+    budget of uncompressed bytes is reached, ending on a line boundary
+    where possible. Return the rewound compressed buffer and its size.
+    """
+
+    buffer: SpooledTemporaryFile = SpooledTemporaryFile(max_size=spoolSize)
+    consumed: int = 0
+
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as archive:
+        while block := data.read(min(65536, budget - consumed)):
+            if (consumed + len(block)) < budget:
+                archive.write(block)
+
+                consumed += len(block)
+
+                continue
+
+            # Leave the partial line for the next part, unless this part
+            # would otherwise be empty.
+            if (end := block.rfind(b"\n") + 1) == 0:
+                end = 0 if consumed > 0 else len(block)
+
+            data.seek(end - len(block), 1)
+            archive.write(block[:end])
+
+            break
+
+    length: int = buffer.tell()
+
+    buffer.seek(0)
+
+    return buffer, length
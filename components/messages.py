@@ -1,6 +1,9 @@
-from datetime import datetime
+import asyncio
+import heapq
+import re
+from datetime import datetime, timedelta
 from os import environ
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import tanjun
 from hikari import (
@@ -8,84 +11,151 @@ from hikari import (
     GuildMessageCreateEvent,
     GuildTextChannel,
     GuildThreadChannel,
+    GuildThreadCreateEvent,
+    GuildThreadDeleteEvent,
+    GuildThreadUpdateEvent,
     InteractionChannel,
     Member,
     MessageType,
+    NotFoundError,
     Permissions,
+    Snowflake,
     StickerFormatType,
 )
 from hikari.messages import Message
 from loguru import logger
-from tanjun import Component
+from tanjun import Client, Component
 from tanjun.abc import MenuContext, SlashContext
 from tanjun.commands import SlashCommandGroup
 
 from helpers import Responses, Timestamps, Utility
+from models import Config, MessageFacts
+from services import Users
 
 component: Component = Component(name="Messages")
 
+# Maximum age (in seconds) of messages which can be bulk deleted
+bulkAge: int = 1209600
+
+# Maximum number of messages per bulk delete request
+bulkSize: int = 100
+
+# Maximum number of messages to scan for matches in a single purge
+scanLimit: int = 50000
+
+# Standalone digit sequences of a valid Discord snowflake length
+# https://discord.com/developers/docs/reference#snowflakes
+snowflake: re.Pattern = re.compile(r"(?<!\d)\d{17,19}(?!\d)")
+
+# Expiry time and ID of each tracked thread, soonest first, and the
+# tracked threads, see ScheduleThread()
+expiries: List[Tuple[float, int]] = []
+tracked: Dict[int, Tuple[float, GuildThreadChannel]] = {}
+
+# Sleeper task which archives threads as they expire, see ExpireThreads()
+sleeper: Optional[asyncio.Task] = None
+wake: asyncio.Event = asyncio.Event()
+
+# Delay (seconds) before retrying threads which could not be archived
+retryDelay: float = 300.0
+
 parse: SlashCommandGroup = component.with_slash_command(
     tanjun.slash_command_group("parse", "Slash Commands to parse messages.")
 )
 
 
+@component.with_client_callback(tanjun.ClientCallbackNames.STARTED)
+async def StartThreads(
+    config: Config = tanjun.inject(type=Config),
+    bot: GatewayBot = tanjun.inject(type=GatewayBot),
+) -> None:
+    """Begin archiving threads in the configured channels as they expire."""
+
+    global sleeper
+
+    if not config.archiveThreads.enable:
+        return
+
+    sleeper = asyncio.create_task(ExpireThreads(bot, config))
+
+    await ReconcileThreads(bot, config)
+
+
+@component.with_client_callback(tanjun.ClientCallbackNames.CLOSING)
+async def StopThreads() -> None:
+    """Stop archiving threads as they expire."""
+
+    if sleeper is None:
+        return
+
+    sleeper.cancel()
+
+    await asyncio.gather(sleeper, return_exceptions=True)
+
+
 @component.with_schedule
-@tanjun.as_time_schedule(minutes=5)
+@tanjun.as_interval(21600)
 async def TaskArchiveThreads(
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    config: Config = tanjun.inject(type=Config),
     bot: GatewayBot = tanjun.inject(type=GatewayBot),
 ) -> None:
-    """Automatically archive threads in the configured channels."""
+    """
+    Reconcile the thread expiry schedule with the active threads in the
+    configured channels, in case any thread events were missed.
+    """
 
-    if not config["archiveThreads"]["enable"]:
+    if not config.archiveThreads.enable:
         return
 
-    logger.info("Beginning recurring task to archive threads...")
+    await ReconcileThreads(bot, config)
 
-    lifetime: int = config["archiveThreads"]["lifetime"]
-    threads: List[GuildThreadChannel] = await bot.rest.fetch_active_threads(
-        int(environ.get("DISCORD_SERVER_ID"))
-    )
 
-    for thread in threads:
-        if thread.parent_id not in config["archiveThreads"]["channels"]:
-            continue
-        elif thread.is_archived:
-            continue
-        elif Utility.Elapsed(datetime.now(), thread.created_at) < lifetime:
-            continue
+@component.with_listener(GuildThreadCreateEvent)
+async def EventThreadCreate(
+    ctx: GuildThreadCreateEvent,
+    config: Config = tanjun.inject(type=Config),
+) -> None:
+    """Schedule newly-created threads in the configured channels to expire."""
 
-        for role in config["archiveThreads"].get("immuneRoles", []):
-            if await Utility.UserHasRole(thread.owner_id, role, thread.guild_id):
-                continue
+    if not config.archiveThreads.enable:
+        return
 
-        await bot.rest.edit_channel(thread.id, archived=True)
+    ScheduleThread(ctx.thread, config)
 
-        logger.success(
-            f"Archived thread {Responses.ExpandThread(thread, False)} as it exceeded the maximum lifespan"
-        )
 
-        await bot.rest.create_message(
-            config["channels"]["user"],
-            Responses.Log(
-                "thread",
-                f"Archived thread {Responses.ExpandThread(thread)} with reason: *Maximum lifespan exceeded*",
-            ),
-        )
+@component.with_listener(GuildThreadUpdateEvent)
+async def EventThreadUpdate(
+    ctx: GuildThreadUpdateEvent,
+    config: Config = tanjun.inject(type=Config),
+) -> None:
+    """Reschedule or stop tracking threads in the configured channels once updated."""
+
+    if not config.archiveThreads.enable:
+        return
+
+    ScheduleThread(ctx.thread, config)
+
+
+@component.with_listener(GuildThreadDeleteEvent)
+async def EventThreadDelete(ctx: GuildThreadDeleteEvent) -> None:
+    """Stop tracking deleted threads."""
+
+    tracked.pop(int(ctx.thread_id), None)
 
 
-@component.with_listener(GuildMessageCreateEvent)
 async def EventShadowban(
     ctx: GuildMessageCreateEvent,
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    facts: MessageFacts,
+    client: Client,
+    config: Config,
 ) -> None:
     """Silently delete user messages in the configured channels."""
 
-    if not config["shadowban"]["enable"]:
+    if not config.shadowban.enable:
         return
-    elif ctx.author.id not in config["shadowban"]["users"]:
+    elif facts.authorId not in config.shadowban.users:
         return
-    elif ctx.message.channel_id not in config["shadowban"]["channels"]:
+    elif facts.channelId not in config.shadowban.channels:
         return
 
     try:
@@ -108,7 +178,7 @@ async def EventShadowban(
 async def CommandReport(
     ctx: MenuContext,
     message: Message,
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    config: Config = tanjun.inject(type=Config),
 ) -> None:
     """Handler for the Report to Moderators message command."""
 
@@ -160,7 +230,7 @@ async def CommandReport(
             )
 
     await ctx.rest.create_message(
-        config["channels"]["moderators"],
+        config.channels.moderators,
         embed=Responses.Warning(
             title="Message Reported",
             url=f"https://discord.com/channels/{ctx.guild_id}/{message.channel_id}/{message.id}",
@@ -197,11 +267,25 @@ async def CommandReport(
 @tanjun.with_own_permission_check(Permissions.MANAGE_MESSAGES)
 @tanjun.with_own_permission_check(Permissions.SEND_MESSAGES)
 @tanjun.with_own_permission_check(Permissions.READ_MESSAGE_HISTORY)
+@tanjun.with_bool_slash_option(
+    "attachments", "Only delete messages with attachments.", default=False
+)
+@tanjun.with_str_slash_option(
+    "pattern",
+    "Only delete messages with content matching a regular expression.",
+    default=None,
+)
+@tanjun.with_int_slash_option(
+    "max_age",
+    "Maximum message age (in seconds) to delete.",
+    default=None,
+    min_value=1,
+)
 @tanjun.with_user_slash_option(
     "member", "Target a specific member's messages to delete.", default=None
 )
 @tanjun.with_int_slash_option(
-    "amount", "Number of messages to be deleted.", min_value=2, max_value=100
+    "amount", "Number of messages to be deleted.", min_value=2, max_value=10000
 )
 @tanjun.with_channel_slash_option(
     "channel", "Channel to fetch the messages from.", types=[GuildTextChannel]
@@ -212,58 +296,89 @@ async def CommandPurge(
     channel: InteractionChannel,
     amount: int,
     member: Optional[Member],
+    max_age: Optional[int],
+    pattern: Optional[str],
+    attachments: bool,
 ) -> None:
     """Handler for the /purge command."""
 
-    messages: List[int] = []
-    users: List[int] = []
-    last: datetime = datetime.now()
+    expression: Optional[re.Pattern] = None
 
-    try:
-        while len(messages) < amount:
-            for m in await ctx.rest.fetch_messages(channel.id, before=last).limit(100):
-                last = m.timestamp
+    if pattern is not None:
+        try:
+            expression = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            await ctx.respond(
+                embed=Responses.Fail(description=f"Invalid content pattern, {e}.")
+            )
 
-                if m.author.is_system:
-                    continue
-                elif (messageId := m.id) in messages:
-                    continue
+            return
 
-                if member is not None:
-                    if m.author.id != member.id:
-                        continue
+    start: datetime = datetime.now().astimezone()
+    floor: Optional[Snowflake] = None
 
-                if (userId := int(m.author.id)) not in users:
-                    users.append(userId)
+    if max_age is not None:
+        floor = Snowflake.from_datetime(start - timedelta(seconds=max_age))
 
-                messages.append(messageId)
+    users: Set[int] = set()
+    deleted: int = 0
+    pending: Optional[asyncio.Task] = None
+    updated: float = start.timestamp()
 
-                if len(messages) == amount:
-                    break
-    except Exception as e:
-        logger.opt(exception=e).error(
-            f"Failed to fetch messages in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
-        )
+    await ctx.defer()
 
-        if len(messages) == 0:
-            await ctx.respond(
-                embed=Responses.Fail(
-                    description=f"Failed to fetch messages in <#{channel.id}>, {e}."
+    # Each batch is deleted while the next is being fetched
+    try:
+        async for batch, bulk in PurgeBatches(
+            ctx,
+            channel.id,
+            start,
+            amount,
+            floor,
+            member,
+            expression,
+            attachments,
+            users,
+        ):
+            if pending is not None:
+                deleted += await pending
+
+            pending = asyncio.create_task(DeleteBatch(ctx, channel.id, batch, bulk))
+
+            # Stream progress to the deferred response, at most once per second
+            if (datetime.now().timestamp() - updated) < 1.0:
+                continue
+
+            await ctx.edit_initial_response(
+                embed=Responses.Warning(
+                    description=f"Deleted {deleted:,}/{amount:,} messages in <#{channel.id}>..."
                 )
             )
 
-            return
+            updated = datetime.now().timestamp()
 
-    try:
-        await ctx.rest.delete_messages(channel.id, messages)
+        if pending is not None:
+            deleted += await pending
     except Exception as e:
         logger.opt(exception=e).error(
-            f"Failed to delete messages in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
+            f"Failed to purge messages in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
         )
 
-        await ctx.respond(
+        if pending is not None:
+            pending.cancel()
+
+        await ctx.edit_initial_response(
             embed=Responses.Fail(
-                description=f"Failed to delete messages in <#{channel.id}>, {e}."
+                description=f"Failed to purge messages in <#{channel.id}> after deleting {deleted:,}, {e}."
+            )
+        )
+
+        return
+
+    if deleted == 0:
+        await ctx.edit_initial_response(
+            embed=Responses.Warning(
+                description=f"No matching messages found in <#{channel.id}>."
             )
         )
 
@@ -272,7 +387,7 @@ async def CommandPurge(
     uCount: int = len(users)
     uLabel: str = "member"
 
-    mCount: int = len(messages)
+    mCount: int = deleted
     mLabel: str = "message"
 
     if uCount > 1:
@@ -281,135 +396,459 @@ async def CommandPurge(
     if mCount > 1:
         mLabel = "messages"
 
-    await ctx.respond(
+    await ctx.edit_initial_response(
         embed=Responses.Success(
             description=f"Deleted {mCount:,} {mLabel} from {uCount:,} {uLabel} in <#{channel.id}>."
         )
     )
 
+    logger.success(
+        f"Purged {mCount:,} {mLabel} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
+    )
+
 
 @parse.with_command
 @tanjun.with_author_permission_check(Permissions.MANAGE_MESSAGES)
 @tanjun.with_own_permission_check(Permissions.SEND_MESSAGES)
 @tanjun.with_own_permission_check(Permissions.READ_MESSAGE_HISTORY)
+@tanjun.with_str_slash_option(
+    "ban_command",
+    "Command to build a ready-to-paste file of mass-ban commands with (e.g. !massban).",
+    default=None,
+)
+@tanjun.with_str_slash_option(
+    "format",
+    "Return the user IDs as a file attachment in the specified format.",
+    choices={"Text": "txt", "CSV": "csv"},
+    default=None,
+)
 @tanjun.with_str_slash_option("message_id", "Enter the ID of the message to parse.")
 @tanjun.with_channel_slash_option(
     "channel", "Choose a channel to parse a message from.", types=[GuildTextChannel]
 )
 @tanjun.as_slash_command("users", "Parse a message and return any user ID occurrences.")
 async def CommandParseUsers(
-    ctx: SlashContext, channel: InteractionChannel, message_id: str
+    ctx: SlashContext,
+    channel: InteractionChannel,
+    message_id: str,
+    format: Optional[str],
+    ban_command: Optional[str],
 ) -> None:
     """Handler for the /parse users command."""
 
     results: List[int] = []
 
-    # Minimum and maximum length of Discord snowflakes
-    # https://discord.com/developers/docs/reference#snowflakes
-    sMin: int = 17
-    sMax: int = 19
-
     try:
         target: Message = await ctx.rest.fetch_message(channel.id, int(message_id))
 
         if target is None:
             raise ValueError("target message is null")
 
-        if target.type == MessageType.GUILD_MEMBER_JOIN:
-            results.append(target.author.id)
+        results = FindUserIds(target)
+    except Exception as e:
+        logger.opt(exception=e).error(
+            f"Failed to parse message {message_id} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
+        )
 
-        if (content := target.content) is not None:
-            for find in Utility.FindNumbers(content, sMin, sMax):
-                if find in results:
-                    continue
+        await ctx.respond(
+            embed=Responses.Fail(
+                description=f"Failed to fetch parse in <#{channel.id}>, {e}"
+            )
+        )
 
-                results.append(find)
+        return
 
-        for embed in target.embeds:
-            if embed.author is not None:
-                if (name := embed.author.name) is not None:
-                    for find in Utility.FindNumbers(name, sMin, sMax):
-                        if find in results:
-                            continue
+    results = await Users.Validate(ctx.rest, results)
 
-                        results.append(find)
+    if len(results) == 0:
+        await ctx.respond(
+            embed=Responses.Warning(
+                description="No user IDs found in the provided message."
+            )
+        )
 
-            if (title := embed.title) is not None:
-                for find in Utility.FindNumbers(title, sMin, sMax):
-                    if find in results:
-                        continue
+        return
 
-                    results.append(find)
+    inline: str = "\n".join([str(result) for result in results])
 
-            if (desc := embed.description) is not None:
-                for find in Utility.FindNumbers(desc, sMin, sMax):
-                    if find in results:
-                        continue
+    # Reply inline when the IDs fit in a single message, otherwise attach
+    # them as a file in order to avoid message length limits.
+    if (format is None) and (ban_command is None) and (len(inline) < 1750):
+        await ctx.respond(
+            embed=Responses.Success(description=f"Found {len(results):,} user ID(s)...")
+        )
 
-                    results.append(find)
+        await ctx.create_followup(inline)
+    else:
+        await ctx.respond(
+            embed=Responses.Success(description=f"Found {len(results):,} user ID(s)."),
+            attachments=Utility.ExportIds(
+                results, "users", format or "txt", ban_command
+            ),
+        )
 
-            if (fields := embed.fields) is not None:
-                for field in fields:
-                    for find in Utility.FindNumbers(field.name, sMin, sMax):
-                        if find in results:
-                            continue
+    logger.success(
+        f"Parsed {len(results):,} user IDs from message {message_id} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
+    )
 
-                        results.append(find)
 
-                    for find in Utility.FindNumbers(field.value, sMin, sMax):
-                        if find in results:
-                            continue
+async def PurgeBatches(
+    ctx: SlashContext,
+    channel: int,
+    start: datetime,
+    amount: int,
+    floor: Optional[Snowflake],
+    member: Optional[Member],
+    expression: Optional[re.Pattern],
+    attachments: bool,
+    users: Set[int],
+) -> AsyncIterator[Tuple[List[int], bool]]:
+    """
+    Yield the IDs of the messages to purge in batches, newest first, along
+    with whether the batch can be bulk deleted. Authors of the messages
+    are added to the provided set.
+    """
+
+    # Discord cannot bulk delete messages older than 14 days, allow a
+    # minute for the time spent fetching.
+    bulkFloor: Snowflake = Snowflake.from_datetime(
+        start - timedelta(seconds=bulkAge - 60)
+    )
+    batch: List[int] = []
+    bulk: bool = True
+    found: int = 0
+    scanned: int = 0
+
+    # Pages are requested before the last seen message ID, so no message
+    # is visited twice.
+    async for m in ctx.rest.fetch_messages(channel, before=start):
+        scanned += 1
+
+        if (floor is not None) and (m.id < floor):
+            break
+        elif scanned > scanLimit:
+            logger.warning(f"Stopped purge after scanning {scanLimit:,} messages")
+
+            break
+        elif m.author.is_system:
+            continue
+        elif (member is not None) and (m.author.id != member.id):
+            continue
+        elif (attachments) and (len(m.attachments) == 0):
+            continue
+        elif (expression is not None) and (not expression.search(m.content or "")):
+            continue
 
-                        results.append(find)
+        # Messages are newest first, so once they are too old to bulk
+        # delete, so are all that follow.
+        if (bulk) and (m.id < bulkFloor):
+            if len(batch) > 0:
+                yield batch, bulk
 
-            if embed.footer is not None:
-                if (footer := embed.footer.text) is not None:
-                    for find in Utility.FindNumbers(footer, sMin, sMax):
-                        if find in results:
-                            continue
+            batch = []
+            bulk = False
 
-                        results.append(find)
-    except Exception as e:
-        logger.opt(exception=e).error(
-            f"Failed to parse message {message_id} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
+        users.add(int(m.author.id))
+        batch.append(int(m.id))
+
+        found += 1
+
+        if found == amount:
+            break
+        elif len(batch) == bulkSize:
+            yield batch, bulk
+
+            batch = []
+
+    if len(batch) > 0:
+        yield batch, bulk
+
+
+async def DeleteBatch(
+    ctx: SlashContext, channel: int, batch: List[int], bulk: bool
+) -> int:
+    """
+    Delete the provided messages, in a single request when they can be bulk
+    deleted, otherwise one at a time. Return the number of messages deleted.
+    """
+
+    if bulk:
+        await ctx.rest.delete_messages(channel, batch)
+
+        return len(batch)
+
+    for message in batch:
+        try:
+            await ctx.rest.delete_message(channel, message)
+        except NotFoundError:
+            logger.debug(f"Message {message} was already deleted")
+
+    return len(batch)
+
+
+def FindUserIds(target: Message) -> List[int]:
+    """
+    Return the unique snowflakes found in the content and embeds of the
+    provided message, in order of appearance.
+    """
+
+    texts: List[str] = []
+
+    if target.type == MessageType.GUILD_MEMBER_JOIN:
+        texts.append(str(target.author.id))
+
+    if target.content is not None:
+        texts.append(target.content)
+
+    for embed in target.embeds:
+        if embed.author is not None:
+            texts.append(embed.author.name or "")
+
+        texts.append(embed.title or "")
+        texts.append(embed.description or "")
+
+        for field in embed.fields or []:
+            texts.append(field.name)
+            texts.append(field.value)
+
+        if embed.footer is not None:
+            texts.append(embed.footer.text or "")
+
+    results: List[int] = []
+    seen: Set[int] = set()
+
+    for match in snowflake.finditer("\n".join(texts)):
+        if (result := int(match.group())) in seen:
+            continue
+
+        results.append(result)
+        seen.add(result)
+
+    return results
+
+
+async def ArchiveThreads(
+    bot: GatewayBot, config: Config, threads: List[GuildThreadChannel]
+) -> List[GuildThreadChannel]:
+    """
+    Archive the provided expired threads, unless their owner has an
+    immune role, and summarize the archived threads in the user log.
+    Return the threads which should be tried again later.
+    """
+
+    retry: List[GuildThreadChannel] = []
+
+    serverId: int = int(environ.get("DISCORD_SERVER_ID"))
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(config.archiveThreads.concurrency)
+
+    # Roles are determined once per owner, rather than per thread and role
+    if len(config.archiveThreads.immuneRoles) > 0:
+        owners: List[int] = list({int(thread.owner_id) for thread in threads})
+        roles: List[Optional[Set[int]]] = await asyncio.gather(
+            *[FetchRoles(bot, serverId, owner, semaphore) for owner in owners]
         )
+        unknown: Set[int] = {
+            owner for owner, owned in zip(owners, roles) if owned is None
+        }
+        immune: Set[int] = {
+            owner
+            for owner, owned in zip(owners, roles)
+            if (owned is not None)
+            and (not owned.isdisjoint(config.archiveThreads.immuneRoles))
+        }
+
+        # Threads of owners whose roles are unknown are tried again later
+        retry = [thread for thread in threads if int(thread.owner_id) in unknown]
+        threads = [
+            thread
+            for thread in threads
+            if int(thread.owner_id) not in (immune | unknown)
+        ]
+
+    results: List[bool] = await asyncio.gather(
+        *[ArchiveThread(bot, thread, semaphore) for thread in threads]
+    )
+    archived: List[GuildThreadChannel] = [
+        thread for thread, result in zip(threads, results) if result
+    ]
 
-        await ctx.respond(
-            embed=Responses.Fail(
-                description=f"Failed to fetch parse in <#{channel.id}>, {e}"
-            )
+    retry += [thread for thread, result in zip(threads, results) if not result]
+
+    if len(archived) == 0:
+        return retry
+
+    # Summarize the archived threads in as few messages as possible
+    lines: List[str] = [f"- {Responses.ExpandThread(thread)}" for thread in archived]
+    summary: str = Responses.Log(
+        "thread",
+        f"Archived {len(archived):,} thread(s) with reason: *Maximum lifespan exceeded*",
+    )
+
+    for line in lines:
+        if (len(summary) + len(line) + 1) > 2000:
+            await bot.rest.create_message(config.channels.user, summary)
+
+            summary = line
+
+            continue
+
+        summary += f"\n{line}"
+
+    await bot.rest.create_message(config.channels.user, summary)
+
+    return retry
+
+
+def ScheduleThread(thread: GuildThreadChannel, config: Config) -> None:
+    """
+    Track the provided thread until it expires, or stop tracking it if
+    it has been archived.
+    """
+
+    if thread.parent_id not in config.archiveThreads.channels:
+        return
+    elif thread.is_archived:
+        tracked.pop(int(thread.id), None)
+
+        return
+
+    threadId: int = int(thread.id)
+    expiry: float = thread.created_at.timestamp() + config.archiveThreads.lifetime
+
+    # The expiry of a thread never changes, so only new threads are pushed
+    if (entry := tracked.get(threadId)) is not None and (entry[0] == expiry):
+        tracked[threadId] = (expiry, thread)
+
+        return
+
+    TrackThread(thread, expiry)
+
+
+def TrackThread(thread: GuildThreadChannel, expiry: float) -> None:
+    """Track the provided thread until the specified expiry time."""
+
+    threadId: int = int(thread.id)
+
+    tracked[threadId] = (expiry, thread)
+
+    heapq.heappush(expiries, (expiry, threadId))
+
+    # Wake the sleeper should this thread now expire first
+    if expiries[0][0] == expiry:
+        wake.set()
+
+
+async def ReconcileThreads(bot: GatewayBot, config: Config) -> None:
+    """Schedule all active threads in the configured channels to expire."""
+
+    try:
+        threads: List[GuildThreadChannel] = await bot.rest.fetch_active_threads(
+            int(environ.get("DISCORD_SERVER_ID"))
         )
+    except Exception as e:
+        logger.opt(exception=e).error("Failed to fetch active threads")
 
         return
 
-    for result in results:
+    for thread in threads:
+        ScheduleThread(thread, config)
+
+    logger.debug(f"Reconciled thread expiry schedule ({len(tracked):,} tracked)")
+
+
+async def ExpireThreads(bot: GatewayBot, config: Config) -> None:
+    """Sleep until the next tracked thread expires, then archive all expired threads."""
+
+    while True:
+        timeout: Optional[float] = None
+
+        if len(expiries) > 0:
+            timeout = max(0.0, expiries[0][0] - datetime.now().timestamp())
+
         try:
-            logger.debug(
-                f"Validated {result} as user {(await ctx.rest.fetch_user(result)).username}"
-            )
-        except Exception as e:
-            results.remove(result)
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
-            logger.opt(exception=e).debug(
-                f"{result} is not a user ID, removed from results"
+        wake.clear()
+
+        now: float = datetime.now().timestamp()
+        expired: List[GuildThreadChannel] = []
+
+        while (len(expiries) > 0) and (expiries[0][0] <= now):
+            expiry, threadId = heapq.heappop(expiries)
+
+            # Skip entries for threads which were archived or deleted
+            if (entry := tracked.get(threadId)) is None or (entry[0] != expiry):
+                continue
+
+            expired.append(tracked.pop(threadId)[1])
+
+        if len(expired) == 0:
+            continue
+
+        retry: List[GuildThreadChannel] = expired
+
+        try:
+            retry = await ArchiveThreads(bot, config, expired)
+        except Exception as e:
+            logger.opt(exception=e).error(
+                f"Failed to archive {len(expired):,} expired threads"
             )
 
-    if len(results) == 0:
-        await ctx.respond(
-            embed=Responses.Warning(
-                description="No user IDs found in the provided message."
+        for thread in retry:
+            TrackThread(thread, datetime.now().timestamp() + retryDelay)
+
+        if len(retry) > 0:
+            logger.debug(
+                f"Retrying {len(retry):,} expired threads in {retryDelay:,.0f}s"
             )
+
+
+async def FetchRoles(
+    bot: GatewayBot, serverId: int, userId: int, semaphore: asyncio.Semaphore
+) -> Optional[Set[int]]:
+    """
+    Return the role IDs of the specified server member, from the member
+    cache when present, otherwise from the API. Return an empty set if
+    they are not a member, or None if their roles could not be determined.
+    """
+
+    if (member := bot.cache.get_member(serverId, userId)) is not None:
+        return {int(role) for role in member.role_ids}
+
+    try:
+        async with semaphore:
+            member = await bot.rest.fetch_member(serverId, userId)
+    except NotFoundError:
+        return set()
+    except Exception as e:
+        logger.opt(exception=e).error(
+            f"Failed to fetch roles of member {userId} in server {serverId}"
         )
 
         return
 
-    await ctx.respond(
-        embed=Responses.Success(description=f"Found {len(results):,} user ID(s)...")
-    )
+    return {int(role) for role in member.role_ids}
+
+
+async def ArchiveThread(
+    bot: GatewayBot, thread: GuildThreadChannel, semaphore: asyncio.Semaphore
+) -> bool:
+    """Archive the provided thread and return whether it was archived."""
 
-    for result in results:
-        await ctx.create_followup(str(result))
+    try:
+        async with semaphore:
+            await bot.rest.edit_channel(thread.id, archived=True)
+    except Exception as e:
+        logger.opt(exception=e).error(
+            f"Failed to archive thread {Responses.ExpandThread(thread, False)}"
+        )
+
+        return False
 
     logger.success(
-        f"Parsed {len(results):,} user IDs from message {message_id} in {Responses.ExpandGuild(ctx.get_guild(), False)} {Responses.ExpandChannel(channel, False)}"
+        f"Archived thread {Responses.ExpandThread(thread, False)} as it exceeded the maximum lifespan"
     )
+
+    return True
@@ -1,15 +1,23 @@
-from datetime import datetime
-from typing import List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from os import environ
+from typing import List, Optional, Set, Union
 
 import tanjun
-from hikari import InteractionMember, MessageType, Permissions
+from hikari import (
+    InteractionMember,
+    MemberCreateEvent,
+    MessageType,
+    Permissions,
+    Snowflake,
+)
 from hikari.users import UserImpl
 from loguru import logger
-from tanjun import Component
+from tanjun import Client, Component
 from tanjun.abc import SlashContext
 from tanjun.commands import SlashCommandGroup
 
 from helpers import Responses, Utility
+from services import Joins
 
 component: Component = Component(name="Raid")
 
@@ -20,9 +28,45 @@ raid: SlashCommandGroup = component.with_slash_command(
 )
 
 
+@component.with_client_callback(tanjun.ClientCallbackNames.STARTED)
+async def StartJoins(client: Client = tanjun.inject(type=Client)) -> None:
+    """
+    Open the join log and record any joins missed while offline, then
+    begin recording member joins.
+    """
+
+    complete: bool = False
+
+    if (last := Joins.Open()) is not None:
+        complete = await BackfillJoins(client, last)
+
+    Joins.Start(complete)
+
+
+@component.with_listener(MemberCreateEvent)
+async def EventMemberJoin(ctx: MemberCreateEvent) -> None:
+    """Record member joins to the join ledger."""
+
+    if int(ctx.guild_id) != int(environ.get("DISCORD_SERVER_ID")):
+        return
+
+    Joins.Record(int(ctx.user_id), ctx.member.joined_at, ctx.user.created_at)
+
+
 @raid.with_command
 @tanjun.with_author_permission_check(Permissions.BAN_MEMBERS)
 @tanjun.with_own_permission_check(Permissions.SEND_MESSAGES)
+@tanjun.with_str_slash_option(
+    "ban_command",
+    "Command to build a ready-to-paste file of mass-ban commands with (e.g. !massban).",
+    default=None,
+)
+@tanjun.with_str_slash_option(
+    "format",
+    "Return the user IDs as a file attachment in the specified format.",
+    choices={"Text": "txt", "CSV": "csv"},
+    default=None,
+)
 @tanjun.with_user_slash_option(
     "oldest_join", "Least recently-joined user to stop collecting IDs at.", default=None
 )
@@ -58,9 +102,80 @@ async def CommandRaidCollect(
     max_joined: Optional[int],
     newest_join: Optional[Union[InteractionMember, UserImpl]],
     oldest_join: Optional[Union[InteractionMember, UserImpl]],
+    format: Optional[str],
+    ban_command: Optional[str],
 ) -> None:
     """Handler for the /raid collect command."""
 
+    users: Optional[List[int]] = None
+    start: datetime = datetime.now()
+
+    # If both newest_join and oldest_user are set, we can disregard
+    # multiple other arguments.
+    if (newest_join is not None) and (oldest_join is not None):
+        amount = None
+        max_joined = None
+
+    if int(ctx.guild_id) == int(environ.get("DISCORD_SERVER_ID")):
+        users = Joins.Collect(
+            start,
+            amount,
+            max_created,
+            max_joined,
+            None if newest_join is None else int(newest_join.id),
+            getattr(newest_join, "joined_at", None),
+            None if oldest_join is None else int(oldest_join.id),
+        )
+
+    # Fall back to the join messages when the ledger does not cover
+    # the requested range.
+    if users is None:
+        users = await ScanJoins(
+            ctx, start, amount, max_created, max_joined, newest_join, oldest_join
+        )
+
+        if users is None:
+            return
+    else:
+        logger.debug(f"Collected {len(users):,} users from join ledger")
+
+    inline: str = " ".join([str(user) for user in users])
+
+    # Reply inline when the IDs fit in a single message, otherwise attach
+    # them as a file in order to avoid message length limits.
+    if (format is None) and (ban_command is None) and (len(inline) < 1750):
+        await ctx.respond(
+            embed=Responses.Success(description=f"Collected {len(users):,} users.")
+        )
+
+        if len(users) > 0:
+            await ctx.create_followup(inline)
+    else:
+        await ctx.respond(
+            embed=Responses.Success(description=f"Collected {len(users):,} users."),
+            attachments=Utility.ExportIds(users, "users", format or "txt", ban_command),
+        )
+
+    logger.success(
+        f"Collected {len(users):,} users in {Responses.ExpandGuild(ctx.get_guild(), False)}"
+    )
+
+
+async def ScanJoins(
+    ctx: SlashContext,
+    start: datetime,
+    amount: Optional[int],
+    max_created: Optional[int],
+    max_joined: Optional[int],
+    newest_join: Optional[Union[InteractionMember, UserImpl]],
+    oldest_join: Optional[Union[InteractionMember, UserImpl]],
+) -> Optional[List[int]]:
+    """
+    Collect the IDs of recently-joined users from the join messages in
+    the system messages channel. Return None after responding if the
+    collection failed.
+    """
+
     welcomes: Optional[int] = None
 
     try:
@@ -80,65 +195,82 @@ async def CommandRaidCollect(
         return
 
     users: List[int] = []
-    start: datetime = datetime.now()
-    last: datetime = start
-    collect: bool = True
-    active: bool = True
-
-    # If both newest_join and oldest_user are set, we can disregard
-    # multiple other arguments.
-    if (newest_join is not None) and (oldest_join is not None):
-        amount = None
-        max_joined = None
+    seen: Set[int] = set()
+    joins: List[int] = []
+    newest: Optional[int] = None if newest_join is None else int(newest_join.id)
+    oldest: Optional[int] = None if oldest_join is None else int(oldest_join.id)
+
+    # Snowflakes encode their creation time, so join and account ages are
+    # compared as snowflake bounds rather than per-message datetimes.
+    floor: Optional[Snowflake] = None
+    createdFloor: Optional[Snowflake] = None
+
+    if max_joined is not None:
+        floor = Snowflake.from_datetime(
+            start.astimezone() - timedelta(seconds=max_joined)
+        )
 
-    # If newest_join is set, we do not begin collecting immediately.
-    if newest_join is not None:
-        collect = False
+    if max_created is not None:
+        createdFloor = Snowflake.from_datetime(
+            start.astimezone() - timedelta(seconds=max_created)
+        )
 
     try:
-        while active:
-            for m in await ctx.rest.fetch_messages(welcomes, before=last).limit(100):
-                last = m.created_at
-
-                if m.type != MessageType.GUILD_MEMBER_JOIN:
+        if (floor is not None) and (newest is not None):
+            # Walk forwards from the start of the join age window, which
+            # ends as soon as newest_join is reached.
+            ceiling: Snowflake = Snowflake.from_datetime(start.astimezone())
+            found: bool = False
+
+            async for m in ctx.rest.fetch_messages(welcomes, after=floor):
+                if m.id > ceiling:
+                    break
+                elif m.type != MessageType.GUILD_MEMBER_JOIN:
                     continue
 
-                userId: int = int(m.author.id)
+                joins.append(int(m.author.id))
 
-                if max_created is not None:
-                    accountAge: int = Utility.Elapsed(start, m.author.created_at)
+                if joins[-1] == newest:
+                    found = True
 
-                    if accountAge > max_created:
-                        continue
+                    break
 
-                if max_joined is not None:
-                    joinAge: int = Utility.Elapsed(start, m.created_at)
+            # Joins are collected newest first
+            joins = joins[::-1] if found else []
+        else:
+            # Walk backwards from now until the join age window, amount or
+            # oldest_join is exhausted.
+            async for m in ctx.rest.fetch_messages(welcomes, before=start.astimezone()):
+                if (floor is not None) and (m.id < floor):
+                    break
+                elif m.type != MessageType.GUILD_MEMBER_JOIN:
+                    continue
 
-                    if joinAge > max_joined:
-                        active = False
+                userId: int = int(m.author.id)
 
-                        break
+                if (len(joins) == 0) and (newest is not None) and (userId != newest):
+                    continue
 
-                if newest_join is not None:
-                    if userId == int(newest_join.id):
-                        collect = True
+                joins.append(userId)
 
-                if (userId not in users) and (collect):
-                    users.append(userId)
+                if CollectJoin(users, seen, userId, createdFloor):
+                    if len(users) == amount:
+                        break
 
-                if oldest_join is not None:
-                    if userId == int(oldest_join.id):
-                        active = False
+                if userId == oldest:
+                    break
 
-                        break
+            joins = []
 
-                if amount is not None:
-                    if len(users) >= amount:
-                        active = False
+        for userId in joins:
+            CollectJoin(users, seen, userId, createdFloor)
 
-                        break
+            if (userId == oldest) or (len(users) == amount):
+                break
     except Exception as e:
-        logger.opt(exception=e).error(f"Failed to collect {amount:,} recently-joined users in {Responses.ExpandGuild(ctx.get_guild(), False)}")
+        logger.opt(exception=e).error(
+            f"Failed to collect recently-joined users in {Responses.ExpandGuild(ctx.get_guild(), False)}"
+        )
 
         if len(users) == 0:
             await ctx.respond(
@@ -147,25 +279,62 @@ async def CommandRaidCollect(
 
             return
 
-    await ctx.respond(
-        embed=Responses.Success(description=f"Collected {len(users):,} users.")
-    )
+    return users
 
-    logger.success(
-        f"Collected {len(users):,} users in {Responses.ExpandGuild(ctx.get_guild(), False)}"
-    )
 
-    chunk: str = ""
+def CollectJoin(
+    users: List[int], seen: Set[int], userId: int, createdFloor: Optional[Snowflake]
+) -> bool:
+    """
+    Add a joined user to the collected users unless their account is too
+    old or they were already collected. Return whether they were added.
+    """
+
+    if (createdFloor is not None) and (userId < createdFloor):
+        return False
+    elif userId in seen:
+        return False
+
+    users.append(userId)
+    seen.add(userId)
+
+    return True
+
 
-    for user in users:
-        # Reply in chunks of less than 1,750 characters in order to
-        # avoid message length limits.
-        if (len(str(user)) + len(chunk)) >= 1750:
-            await ctx.create_followup(chunk)
+async def BackfillJoins(client: Client, last: int, limit: int = 1000) -> bool:
+    """
+    Record the joins which occurred after the provided time (milliseconds)
+    from the join messages in the system messages channel. Return whether
+    the join log is complete as a result.
+    """
+
+    count: int = 0
+
+    try:
+        welcomes: Optional[int] = (
+            await client.rest.fetch_guild(int(environ.get("DISCORD_SERVER_ID")))
+        ).system_channel_id
+
+        if welcomes is None:
+            return False
+
+        async for message in client.rest.fetch_messages(
+            welcomes, after=datetime.fromtimestamp(last / 1000, timezone.utc)
+        ).limit(limit):
+            count += 1
+
+            if message.type != MessageType.GUILD_MEMBER_JOIN:
+                continue
+
+            Joins.Record(
+                int(message.author.id), message.created_at, message.author.created_at
+            )
+    except Exception as e:
+        logger.opt(exception=e).error("Failed to backfill join log")
 
-            chunk = ""
+        return False
 
-        chunk += f"{user} "
+    logger.debug(f"Backfilled join log from {count:,} system messages")
 
-    if chunk != "":
-        await ctx.create_followup(chunk)
+    # Reaching the limit means that some joins may have been missed
+    return count < limit
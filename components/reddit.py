@@ -1,13 +1,17 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 import tanjun
 from asyncpraw.models.reddit.subreddit import Subreddit
 from asyncpraw.reddit import Reddit
+from hikari.embeds import Embed
 from loguru import logger
 from tanjun import Component, SlashCommandGroup
 from tanjun.abc import SlashContext
 
-from helpers import Responses
+from helpers import Responses, Timestamps
+from models import Config, RedditQueue
 from services import Reddit
 
 component: Component = Component(name="Reddit")
@@ -30,6 +34,36 @@ communities: Dict[str, str] = {
 }
 
 
+@component.with_client_callback(tanjun.ClientCallbackNames.CLOSING)
+async def StopClient() -> None:
+    """Close the long-lived Reddit client."""
+
+    await Reddit.CloseClient()
+
+
+@component.with_schedule
+@tanjun.as_interval(120)
+async def TaskRefreshQueues(
+    client: Optional[Reddit] = tanjun.inject(callback=Reddit.GetClient),
+    config: Config = tanjun.inject(type=Config),
+) -> None:
+    """Keep the cached queue counts for all Reddit communities fresh."""
+
+    if client is None:
+        return
+
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(config.reddit.queueConcurrency)
+
+    await asyncio.gather(
+        *[
+            CountQueues(client, entry, communities[entry], config, semaphore)
+            for entry in communities
+        ]
+    )
+
+    logger.debug("Refreshed queue counts for all Reddit communities")
+
+
 @reddit.with_command
 @tanjun.with_str_slash_option(
     "community",
@@ -41,10 +75,28 @@ communities: Dict[str, str] = {
     "queue",
     "Fetch the moderation and unmoderated queue counts for the specified Reddit community.",
 )
-async def CommandRedditQueue(ctx: SlashContext, community: Optional[str]) -> None:
+async def CommandRedditQueue(
+    ctx: SlashContext,
+    community: Optional[str],
+    client: Optional[Reddit] = tanjun.inject(callback=Reddit.GetClient),
+    config: Config = tanjun.inject(type=Config),
+) -> None:
     """Handler for the /reddit queue command."""
 
-    client: Optional[Reddit] = await Reddit.CreateClient()
+    if community is None:
+        if (cached := CachedQueues(list(communities), config)) is not None:
+            await ctx.respond(embed=QueueEmbed(*cached))
+
+            return
+    elif (cached := CachedQueues([f"r/{community}"], config)) is not None:
+        if (subreddit := Reddit.subreddits.get(community)) is not None:
+            counts, updated = cached
+
+            await ctx.respond(
+                embed=SubredditEmbed(subreddit, *counts[f"r/{community}"], updated)
+            )
+
+            return
 
     if client is None:
         await ctx.respond(
@@ -55,31 +107,44 @@ async def CommandRedditQueue(ctx: SlashContext, community: Optional[str]) -> Non
 
         return
 
-    if community is None:
-        results: List[Dict[str, Any]] = []
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(config.reddit.queueConcurrency)
 
-        for entry in communities:
-            subreddit: Optional[Subreddit] = await Reddit.GetSubreddit(
-                client, communities[entry]
+    await ctx.defer()
+
+    if community is None:
+        results: Dict[str, Tuple[str, str]] = {}
+        tasks: List[asyncio.Task] = [
+            asyncio.create_task(
+                CountQueues(client, entry, communities[entry], config, semaphore)
             )
+            for entry in communities
+        ]
+        updated: float = datetime.now().timestamp()
 
-            if subreddit is None:
+        for task in asyncio.as_completed(tasks):
+            entry, mod, unmod = await task
+
+            if (mod is None) or (unmod is None):
                 continue
 
-            mod: int = await Reddit.CountModqueue(client, subreddit)
-            unmod: int = await Reddit.CountUnmoderated(client, subreddit)
+            results[entry] = (mod, unmod)
+
+            # Stream progress to the deferred response, at most once per second
+            if (datetime.now().timestamp() - updated) < 1.0:
+                continue
 
-            results.append(
-                {
-                    "name": entry,
-                    "value": f"Moderation: [{mod:,}](https://reddit.com/{entry}/about/modqueue)\nUnmoderated: [{unmod:,}](https://reddit.com/{entry}/about/unmoderated)",
-                }
+            await ctx.edit_initial_response(
+                embed=QueueEmbed(
+                    results,
+                    updated,
+                    f"Counted {len(results):,}/{len(communities):,} communities...",
+                )
             )
 
-        await Reddit.DestroyClient(client)
+            updated = datetime.now().timestamp()
 
         if len(results) == 0:
-            await ctx.respond(
+            await ctx.edit_initial_response(
                 embed=Responses.Fail(
                     description="Failed to fetch queue counts for all Reddit communities, an unknown error occurred."
                 )
@@ -87,26 +152,20 @@ async def CommandRedditQueue(ctx: SlashContext, community: Optional[str]) -> Non
 
             return
 
-        await ctx.respond(
-            embed=Responses.Success(
-                color="FF4500",
-                fields=results,
-                author="Reddit",
-                authorUrl="https://www.reddit.com/r/Mod/",
-                authorIcon="https://i.imgur.com/yZujOa5.png",
-            )
+        await ctx.edit_initial_response(
+            embed=QueueEmbed(results, datetime.now().timestamp())
         )
 
         logger.success("Fetched queue counts for all Reddit communities")
 
         return
 
-    subreddit: Subreddit = await Reddit.GetSubreddit(client, community)
-
-    if subreddit is None:
-        await Reddit.DestroyClient(client)
+    _, mod, unmod = await CountQueues(
+        client, f"r/{community}", community, config, semaphore
+    )
 
-        await ctx.respond(
+    if (mod is None) or (unmod is None):
+        await ctx.edit_initial_response(
             embed=Responses.Fail(
                 description=f"Failed to fetch Reddit community r/{community}, an unknown error occurred."
             )
@@ -114,28 +173,142 @@ async def CommandRedditQueue(ctx: SlashContext, community: Optional[str]) -> Non
 
         return
 
-    mod: int = await Reddit.CountModqueue(client, subreddit)
-    unmod: int = await Reddit.CountUnmoderated(client, subreddit)
-
-    await Reddit.DestroyClient(client)
-
-    await ctx.respond(
-        embed=Responses.Success(
-            color=subreddit.primary_color,
-            fields=[
-                {
-                    "name": "Moderation",
-                    "value": f"[{mod:,}](https://reddit.com/r/{community}/about/modqueue)",
-                },
-                {
-                    "name": "Unmoderated",
-                    "value": f"[{unmod:,}](https://reddit.com/r/{community}/about/unmoderated)",
-                },
-            ],
-            author=f"r/{community}",
-            authorUrl=f"https://www.reddit.com/r/{community}",
-            authorIcon=subreddit.community_icon,
+    await ctx.edit_initial_response(
+        embed=SubredditEmbed(
+            Reddit.subreddits[community], mod, unmod, datetime.now().timestamp()
         )
     )
 
     logger.success(f"Fetched queue counts for Reddit community r/{community}")
+
+
+async def CountQueues(
+    client: Reddit,
+    entry: str,
+    name: str,
+    config: Config,
+    semaphore: asyncio.Semaphore,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Concurrently refresh the moderation and unmoderated queues for the
+    specified Reddit community, returning the formatted counts.
+    """
+
+    if (community := Reddit.subreddits.get(name)) is None:
+        if (community := await Reddit.GetSubreddit(client, name)) is None:
+            return entry, None, None
+
+        Reddit.subreddits[name] = community
+
+    # Queue counts stop at the configured limit, shown as "1,000+"
+    limit: int = config.reddit.queueLimit
+    resync: int = config.reddit.queueResync
+
+    async def Count(queue: str) -> Optional[str]:
+        async with semaphore:
+            cache: Optional[RedditQueue] = await Reddit.RefreshQueue(
+                community, name, queue, limit, resync
+            )
+
+        if cache is None:
+            return
+
+        return FormatCount(len(cache.seen), limit)
+
+    mod, unmod = await asyncio.gather(Count("modqueue"), Count("unmoderated"))
+
+    return entry, mod, unmod
+
+
+def CachedQueues(
+    entries: List[str], config: Config
+) -> Optional[Tuple[Dict[str, Tuple[str, str]], float]]:
+    """
+    Return the formatted queue counts and the oldest update time for the
+    specified Reddit communities, or None if any of them are not cached.
+    """
+
+    limit: int = config.reddit.queueLimit
+    results: Dict[str, Tuple[str, str]] = {}
+    updated: float = datetime.now().timestamp()
+
+    for entry in entries:
+        mod: Optional[RedditQueue] = Reddit.queues.get(f"{entry[2:]}/modqueue")
+        unmod: Optional[RedditQueue] = Reddit.queues.get(f"{entry[2:]}/unmoderated")
+
+        if (mod is None) or (unmod is None):
+            return
+
+        results[entry] = (
+            FormatCount(len(mod.seen), limit),
+            FormatCount(len(unmod.seen), limit),
+        )
+        updated = min(updated, mod.updated, unmod.updated)
+
+    return results, updated
+
+
+def FormatCount(total: int, limit: int) -> str:
+    """Format a queue count, marking counts which exceed the limit."""
+
+    if total > limit:
+        return f"{limit:,}+"
+
+    return f"{total:,}"
+
+
+def QueueEmbed(
+    results: Dict[str, Tuple[str, str]],
+    updated: float,
+    progress: Optional[str] = None,
+) -> Embed:
+    """Build the queue counts response for all Reddit communities."""
+
+    fields: List[Dict[str, Any]] = []
+
+    for entry in communities:
+        if entry not in results:
+            continue
+
+        mod, unmod = results[entry]
+
+        fields.append(
+            {
+                "name": entry,
+                "value": f"Moderation: [{mod}](https://reddit.com/{entry}/about/modqueue)\nUnmoderated: [{unmod}](https://reddit.com/{entry}/about/unmoderated)",
+            }
+        )
+
+    return Responses.Success(
+        color="FF4500",
+        description=f"Updated {Timestamps.Relative(updated)}",
+        fields=fields,
+        author="Reddit",
+        authorUrl="https://www.reddit.com/r/Mod/",
+        authorIcon="https://i.imgur.com/yZujOa5.png",
+        footer=progress,
+    )
+
+
+def SubredditEmbed(subreddit: Subreddit, mod: str, unmod: str, updated: float) -> Embed:
+    """Build the queue counts response for a single Reddit community."""
+
+    community: str = subreddit.display_name
+
+    return Responses.Success(
+        color=subreddit.primary_color,
+        description=f"Updated {Timestamps.Relative(updated)}",
+        fields=[
+            {
+                "name": "Moderation",
+                "value": f"[{mod}](https://reddit.com/r/{community}/about/modqueue)",
+            },
+            {
+                "name": "Unmoderated",
+                "value": f"[{unmod}](https://reddit.com/r/{community}/about/unmoderated)",
+            },
+        ],
+        author=f"r/{community}",
+        authorUrl=f"https://www.reddit.com/r/{community}",
+        authorIcon=subreddit.community_icon,
+    )
@@ -1,84 +1,156 @@
-from typing import Any, Dict, List, Sequence
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, List, Sequence
 
-import tanjun
+from hikari.events.member_events import MemberUpdateEvent
 from hikari.events.message_events import GuildMessageCreateEvent
 from hikari.snowflakes import Snowflake
 from loguru import logger
 from tanjun import Client, Component
 
 from helpers.responses import Responses
+from models import Config, MessageFacts
 
 component: Component = Component(name="Roles")
 
+# Audit log reason for each role invalidation, see ValidateRoles()
+reasons: Dict[str, str] = {
+    "Limit exceeded": "Member exceeds the limit of allowed roles.",
+    "Requirements not met": "Member does not meet the requirements to equip this role.",
+}
+
+# Hash of the last validated role set for each member, least recently
+# seen first, see EventValidateRoles()
+validated: OrderedDict[int, int] = OrderedDict()
+memoSize: int = 10000
+
+# Time of the last role reconciliation for each member, oldest first
+actions: Dict[int, float] = {}
+debounce: float = 10.0
+
+
+@component.with_listener(MemberUpdateEvent)
+async def EventMemberUpdate(ctx: MemberUpdateEvent) -> None:
+    """Forget the validated role set of a member once it is updated."""
+
+    validated.pop(int(ctx.user_id), None)
+
 
-@component.with_listener(GuildMessageCreateEvent)
 async def EventValidateRoles(
     ctx: GuildMessageCreateEvent,
-    client: Client = tanjun.inject(type=Client),
-    config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any]),
+    facts: MessageFacts,
+    client: Client,
+    config: Config,
 ) -> None:
     """
     Validate that the configured role requirements are met for the
     given member upon message creation.
     """
 
-    if not ctx.is_human:
+    if not facts.human:
         return
     elif ctx.message.member is None:
         return
 
-    invalidated: List[int] = []
     equipped: Sequence[Snowflake] = ctx.message.member.role_ids
+    key: int = hash(frozenset(equipped))
 
-    if config["roles"]["limit"]:
-        matches: List[int] = []
-
-        for role in equipped:
-            if role in config["roles"]["allow"]:
-                matches.append(role)
-
-        if len(matches) > 1:
-            for match in matches[1:]:
-                await ctx.message.member.remove_role(
-                    match, reason="Member exceeds the limit of allowed roles."
-                )
-
-                await client.rest.create_message(
-                    config["channels"]["user"],
-                    Responses.Log(
-                        "shirt",
-                        f"Removed role (`{match}`) from {Responses.ExpandUser(ctx.author)} with reason: *Limit exceeded*",
-                    ),
-                )
-
-                logger.success(
-                    f"Invalidated role ({match}) for {Responses.ExpandUser(ctx.author, False)} in {Responses.ExpandGuild(ctx.get_guild(), False)}"
-                )
-
-            # Fetch equipped roles again to continue validation
-            equipped: Sequence[Snowflake] = ctx.message.member.role_ids
-
-    for role in equipped:
-        if role in config["roles"]["require"]:
-            return
-
-    for role in equipped:
-        if role in config["roles"]["allow"]:
-            invalidated.append(role)
-
-    for role in invalidated:
-        await ctx.message.member.remove_role(
-            role, reason="Member does not meet the requirements to equip this role."
-        )
+    if validated.get(facts.authorId) == key:
+        validated.move_to_end(facts.authorId)
 
-        await client.rest.create_message(
-            config["channels"]["user"],
-            Responses.Log(
-                "shirt",
-                f"Removed role (`{role}`) from {Responses.ExpandUser(ctx.author)} with reason: *Requirements not met*",
-            ),
-        )
+        return
+
+    invalidated: Dict[int, str] = ValidateRoles(equipped, config)
+
+    if len(invalidated) == 0:
+        RememberRoles(facts.authorId, key)
 
-        logger.success(
-            f"Invalidated role ({role}) for {Responses.ExpandUser(ctx.author, False)} in {Responses.ExpandGuild(ctx.get_guild(), False)}"
+        return
+
+    # Messages sent before a reconciliation is applied still carry the
+    # previous roles, only act once per member within the debounce.
+    if (monotonic() - actions.get(facts.authorId, 0.0)) < debounce:
+        return
+
+    RecordAction(facts.authorId)
+
+    kept: List[int] = [role for role in equipped if role not in invalidated]
+
+    roles: str = ", ".join([f"`{role}`" for role in invalidated])
+    causes: List[str] = list(dict.fromkeys(invalidated.values()))
+
+    try:
+        await client.rest.edit_member(
+            ctx.guild_id,
+            ctx.author_id,
+            roles=kept,
+            reason=" ".join([reasons[cause] for cause in causes]),
+        )
+    except Exception as e:
+        logger.opt(exception=e).error(
+            f"Failed to invalidate roles ({roles}) for {Responses.ExpandUser(ctx.author, False)} in {Responses.ExpandGuild(ctx.get_guild(), False)}"
         )
+
+        return
+
+    await client.rest.create_message(
+        config.channels.user,
+        Responses.Log(
+            "shirt",
+            f"Removed {'role' if len(invalidated) == 1 else 'roles'} ({roles}) from {Responses.ExpandUser(ctx.author)} with reason: "
+            + ", ".join([f"*{cause}*" for cause in causes]),
+        ),
+    )
+
+    RememberRoles(facts.authorId, hash(frozenset(kept)))
+
+    logger.success(
+        f"Invalidated roles ({roles}) for {Responses.ExpandUser(ctx.author, False)} in {Responses.ExpandGuild(ctx.get_guild(), False)}"
+    )
+
+
+def RememberRoles(member: int, key: int) -> None:
+    """Record the validated role set of a member, evicting the least recent."""
+
+    validated[member] = key
+    validated.move_to_end(member)
+
+    while len(validated) > memoSize:
+        validated.popitem(last=False)
+
+
+def RecordAction(member: int) -> None:
+    """Record a role reconciliation for a member, expiring stale entries."""
+
+    now: float = monotonic()
+
+    actions.pop(member, None)
+    actions[member] = now
+
+    while (now - actions[oldest := next(iter(actions))]) >= debounce:
+        actions.pop(oldest)
+
+
+def ValidateRoles(equipped: Sequence[int], config: Config) -> Dict[int, str]:
+    """
+    Determine which of the equipped roles must be removed to meet the
+    configured role requirements, mapped to the cause of their removal.
+    """
+
+    invalidated: Dict[int, str] = {}
+    allowed: List[int] = [role for role in equipped if role in config.roles.allow]
+
+    # Only the first allowed role is kept when the limit is exceeded
+    if config.roles.limit:
+        for role in allowed[1:]:
+            invalidated[role] = "Limit exceeded"
+
+        allowed = allowed[:1]
+
+    remaining: List[int] = [role for role in equipped if role not in invalidated]
+
+    if config.roles.require.isdisjoint(remaining):
+        for role in allowed:
+            invalidated[role] = "Requirements not met"
+
+    return invalidated
@@ -1,9 +1,9 @@
-from typing import Any, Dict
-
 import tanjun
 from loguru import logger
 from tanjun.abc import MenuContext, SlashContext
 
+from models import Config
+
 from .responses import Responses
 
 
@@ -18,12 +18,12 @@ class MenuHooks:
         )
 
     async def PostExecution(
-        ctx: MenuContext, config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any])
+        ctx: MenuContext, config: Config = tanjun.inject(type=Config)
     ) -> None:
         """Menu command pre-execution hook."""
 
         await ctx.rest.create_message(
-            config["channels"]["user"],
+            config.channels.user,
             Responses.Log(
                 "robot",
                 f"{Responses.ExpandUser(ctx.author)} used `{ctx.command.name}` in {Responses.ExpandChannel(ctx.get_channel())}",
@@ -52,7 +52,7 @@ class SlashHooks:
         )
 
     async def PostExecution(
-        ctx: SlashContext, config: Dict[str, Any] = tanjun.inject(type=Dict[str, Any])
+        ctx: SlashContext, config: Config = tanjun.inject(type=Config)
     ) -> None:
         """Slash command post-execution hook."""
 
@@ -67,7 +67,7 @@ class SlashHooks:
         command += ctx.command.name
 
         await ctx.rest.create_message(
-            config["channels"]["user"],
+            config.channels.user,
             Responses.Log(
                 "robot",
                 f"{Responses.ExpandUser(ctx.author)} used `{command}` in {Responses.ExpandChannel(ctx.get_channel())}",
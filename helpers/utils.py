@@ -1,10 +1,14 @@
+import asyncio
+import csv
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from io import StringIO
+from tempfile import SpooledTemporaryFile
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-import httpx
 from hikari import GatewayBot, Member
-from httpx import Response
+from hikari.files import Bytes
+from httpx import URL, AsyncClient, Limits, Response, Timeout
 from loguru import logger
 
 from .responses import Responses
@@ -13,6 +17,73 @@ from .responses import Responses
 class Utility:
     """Utilitarian functions designed for N31L."""
 
+    # Long-lived HTTP client shared by every request, see Utility.HTTP()
+    http: Optional[AsyncClient] = None
+
+    # Maximum number of concurrent requests to a single host
+    hostLimit: int = 10
+    hosts: Dict[str, asyncio.Semaphore] = {}
+
+    # Compiled keyword matcher and the keywords it was built from, see
+    # Utility.CompileKeywords()
+    matcher: Optional[Tuple[Sequence[str], Dict[str, List[Tuple[List[str], str]]]]] = (
+        None
+    )
+    wordPattern: re.Pattern = re.compile(r"\w+")
+
+    def HTTP() -> AsyncClient:
+        """
+        Return the shared HTTP client, creating it if it does not yet
+        exist. Connections are pooled and kept alive between requests,
+        and HTTP/2 is negotiated where supported.
+        """
+
+        if Utility.http is not None:
+            return Utility.http
+
+        Utility.http = AsyncClient(
+            http2=True,
+            limits=Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+            timeout=Timeout(5.0),
+            follow_redirects=True,
+        )
+
+        logger.debug("Created shared HTTP client")
+
+        return Utility.http
+
+    async def CloseHTTP() -> None:
+        """Close the shared HTTP client and its pooled connections."""
+
+        if Utility.http is None:
+            return
+
+        try:
+            await Utility.http.aclose()
+        except Exception as e:
+            logger.opt(exception=e).warning("Failed to close shared HTTP client")
+
+        Utility.http = None
+        Utility.hosts = {}
+
+        logger.debug("Closed shared HTTP client")
+
+    def HostLimit(url: str) -> asyncio.Semaphore:
+        """Return the concurrency limiter for the host of the provided URL."""
+
+        host: str = URL(url).host
+
+        if (limit := Utility.hosts.get(host)) is None:
+            limit = asyncio.Semaphore(Utility.hostLimit)
+
+            Utility.hosts[host] = limit
+
+        return limit
+
     async def GET(
         url: str, headers: Optional[Dict[str, str]] = None
     ) -> Optional[Union[str, Dict[str, Any]]]:
@@ -21,10 +92,8 @@ class Utility:
         logger.debug(f"GET {url}")
 
         try:
-            async with httpx.AsyncClient() as http:
-                res: Response = await http.get(
-                    url, headers=headers, follow_redirects=True
-                )
+            async with Utility.HostLimit(url):
+                res: Response = await Utility.HTTP().get(url, headers=headers)
 
             res.raise_for_status()
 
@@ -41,14 +110,52 @@ class Utility:
 
         return res.text
 
+    async def Download(
+        url: str, limit: int, spool: int = 1048576
+    ) -> Optional[Tuple[SpooledTemporaryFile, int]]:
+        """
+        Stream the response body of an HTTP GET request into a spooled
+        buffer, which is kept in memory until it exceeds the spool size.
+        Return the rewound buffer and its size, or None if the body
+        exceeds the limit.
+        """
+
+        logger.debug(f"GET {url}")
+
+        buffer: SpooledTemporaryFile = SpooledTemporaryFile(max_size=spool)
+        size: int = 0
+
+        try:
+            async with Utility.HostLimit(url):
+                async with Utility.HTTP().stream("GET", url) as res:
+                    res.raise_for_status()
+
+                    async for chunk in res.aiter_bytes():
+                        size += len(chunk)
+
+                        if size > limit:
+                            raise ValueError(f"Response exceeds {limit:,} bytes")
+
+                        buffer.write(chunk)
+        except Exception as e:
+            logger.opt(exception=e).error(f"Failed to GET {url}")
+
+            buffer.close()
+
+            return
+
+        buffer.seek(0)
+
+        return buffer, size
+
     async def POST(url: str, payload: Dict[str, Any]) -> bool:
         """Perform an HTTP POST request and return its status."""
 
         logger.debug(f"POST {url}")
 
         try:
-            async with httpx.AsyncClient() as http:
-                res: Response = await http.post(
+            async with Utility.HostLimit(url):
+                res: Response = await Utility.HTTP().post(
                     url,
                     json=payload,
                     headers={"content-type": "application/json"},
@@ -116,6 +223,113 @@ class Utility:
 
         return results
 
+    def ExportIds(
+        ids: List[int],
+        filename: str,
+        format: str = "txt",
+        command: Optional[str] = None,
+    ) -> List[Bytes]:
+        """
+        Build the provided IDs into a single text or CSV attachment, along
+        with a file of ready-to-paste commands when a command is provided.
+        """
+
+        buffer: StringIO = StringIO()
+
+        if format == "csv":
+            writer = csv.writer(buffer)
+
+            writer.writerow(["id"])
+            writer.writerows([[id] for id in ids])
+        else:
+            buffer.writelines([f"{id}\n" for id in ids])
+
+        files: List[Bytes] = [Bytes(buffer.getvalue().encode(), f"{filename}.{format}")]
+
+        if command is not None:
+            files.append(
+                Bytes(
+                    Utility.ChunkCommands(ids, command).encode(),
+                    f"{filename}_commands.txt",
+                )
+            )
+
+        return files
+
+    def ChunkCommands(ids: List[int], command: str, length: int = 2000) -> str:
+        """
+        Build one command per line from the provided IDs, with as many IDs
+        per command as fit within the message length limit.
+        """
+
+        lines: List[str] = []
+        line: str = command
+
+        for id in ids:
+            if (len(line) + len(str(id)) + 1) > length and (line != command):
+                lines.append(line)
+
+                line = command
+
+            line += f" {id}"
+
+        if line != command:
+            lines.append(line)
+
+        return "\n".join(lines) + "\n"
+
+    def CompileKeywords(
+        keywords: Sequence[str],
+    ) -> Dict[str, List[Tuple[List[str], str]]]:
+        """
+        Compile the provided keywords into a matcher which maps the first
+        word of each keyword to its full sequence of words, longest first.
+        The matcher is reused until a different sequence of keywords is given.
+        """
+
+        if (Utility.matcher is not None) and (Utility.matcher[0] is keywords):
+            return Utility.matcher[1]
+
+        index: Dict[str, List[Tuple[List[str], str]]] = {}
+
+        for keyword in keywords:
+            if len(words := Utility.wordPattern.findall(keyword.lower())) == 0:
+                continue
+
+            index.setdefault(words[0], []).append((words, keyword))
+
+        for phrases in index.values():
+            phrases.sort(key=lambda phrase: len(phrase[0]), reverse=True)
+
+        Utility.matcher = (keywords, index)
+
+        logger.debug(f"Compiled keyword matcher for {len(keywords):,} keywords")
+
+        return index
+
+    def FindKeywords(content: str, keywords: Sequence[str]) -> List[str]:
+        """
+        Return the keywords found in the provided lowercased content, in a
+        single pass. Keywords may be multi-word phrases and punctuation is
+        ignored.
+        """
+
+        index: Dict[str, List[Tuple[List[str], str]]] = Utility.CompileKeywords(
+            keywords
+        )
+        words: List[str] = Utility.wordPattern.findall(content)
+        found: Dict[str, None] = {}
+
+        for i, word in enumerate(words):
+            if (phrases := index.get(word)) is None:
+                continue
+
+            for phrase, keyword in phrases:
+                if words[i : i + len(phrase)] == phrase:
+                    found[keyword] = None
+
+        return list(found)
+
     async def UserHasRole(
         userId: int, roleId: int, serverId: int, bot: GatewayBot
     ) -> bool:
@@ -1,2 +1,6 @@
 # ruff: noqa: F401
+from .config import Config
+from .message import MessageFacts
+from .reddit import RedditImage, RedditQueue
+from .source import SourceHealth
 from .state import State
@@ -0,0 +1,165 @@
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Dict, FrozenSet, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    """
+    Base dataclass object for a validated section of the configuration.
+    Integer fields with the "positive" metadata flag must be at least 1.
+    """
+
+    @classmethod
+    def Parse(cls, data: Dict[str, Any], name: str) -> "Section":
+        """Validate the provided configuration section and build its object."""
+
+        if not isinstance(data, dict):
+            raise ValueError(f"{name} must be an object")
+
+        values: Dict[str, Any] = {}
+
+        for entry in fields(cls):
+            key: str = f"{name}.{entry.name}"
+
+            if entry.name not in data:
+                if (entry.default is MISSING) and (entry.default_factory is MISSING):
+                    raise ValueError(f"{key} is required")
+
+                continue
+
+            value: Any = data[entry.name]
+
+            if entry.type is bool:
+                if not isinstance(value, bool):
+                    raise ValueError(f"{key} must be a boolean")
+            elif entry.type is int:
+                if (not isinstance(value, int)) or isinstance(value, bool):
+                    raise ValueError(f"{key} must be an integer")
+                elif (entry.metadata.get("positive")) and (value < 1):
+                    raise ValueError(f"{key} must be a positive integer")
+            elif entry.type == FrozenSet[int]:
+                if (not isinstance(value, list)) or (
+                    not all(
+                        isinstance(x, int) and not isinstance(x, bool) for x in value
+                    )
+                ):
+                    raise ValueError(f"{key} must be a list of integers")
+
+                value = frozenset(value)
+            elif entry.type == Tuple[str, ...]:
+                if (not isinstance(value, list)) or (
+                    not all(isinstance(x, str) for x in value)
+                ):
+                    raise ValueError(f"{key} must be a list of strings")
+
+                value = tuple(value)
+
+            values[entry.name] = value
+
+        return cls(**values)
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingConfig(Section):
+    """Dataclass object containing the keyword and mention logging configuration."""
+
+    keywords: Tuple[str, ...]
+    kwIgnore: FrozenSet[int]
+    mentions: FrozenSet[int]
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelsConfig(Section):
+    """Dataclass object containing the configured channel IDs."""
+
+    moderators: int
+    moderation: int
+    user: int
+
+
+@dataclass(frozen=True, slots=True)
+class UsersConfig(Section):
+    """Dataclass object containing the configured user IDs."""
+
+    owner: int
+    bot: int
+
+
+@dataclass(frozen=True, slots=True)
+class RolesConfig(Section):
+    """Dataclass object containing the role validation configuration."""
+
+    limit: bool
+    require: FrozenSet[int]
+    allow: FrozenSet[int]
+
+
+@dataclass(frozen=True, slots=True)
+class ShadowbanConfig(Section):
+    """Dataclass object containing the shadowban configuration."""
+
+    enable: bool
+    users: FrozenSet[int]
+    channels: FrozenSet[int]
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveThreadsConfig(Section):
+    """Dataclass object containing the thread archival configuration."""
+
+    enable: bool
+    lifetime: int = field(metadata={"positive": True})
+    channels: FrozenSet[int]
+    immuneRoles: FrozenSet[int] = frozenset()
+    concurrency: int = field(default=4, metadata={"positive": True})
+
+
+@dataclass(frozen=True, slots=True)
+class BuffersConfig(Section):
+    """Dataclass object containing the prefetched image buffer configuration."""
+
+    depth: int = field(default=3, metadata={"positive": True})
+    concurrency: int = field(default=2, metadata={"positive": True})
+
+
+@dataclass(frozen=True, slots=True)
+class RedditConfig(Section):
+    """Dataclass object containing the Reddit queue configuration."""
+
+    queueLimit: int = field(default=1000, metadata={"positive": True})
+    queueConcurrency: int = field(default=8, metadata={"positive": True})
+    queueResync: int = field(default=1800, metadata={"positive": True})
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Dataclass object containing the validated, immutable configuration."""
+
+    logging: LoggingConfig
+    channels: ChannelsConfig
+    users: UsersConfig
+    roles: RolesConfig
+    shadowban: ShadowbanConfig
+    archiveThreads: ArchiveThreadsConfig
+    buffers: BuffersConfig = field(default_factory=BuffersConfig)
+    reddit: RedditConfig = field(default_factory=RedditConfig)
+
+    @classmethod
+    def Parse(cls, data: Dict[str, Any]) -> "Config":
+        """Validate the provided configuration values and build the Config object."""
+
+        if not isinstance(data, dict):
+            raise ValueError("configuration must be an object")
+
+        values: Dict[str, Any] = {}
+
+        for entry in fields(cls):
+            if entry.name not in data:
+                if entry.default_factory is MISSING:
+                    raise ValueError(f"{entry.name} is required")
+
+                continue
+
+            values[entry.name] = entry.type.Parse(data[entry.name], entry.name)
+
+        return cls(**values)
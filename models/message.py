@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import Optional, Set
+
+from hikari.events.message_events import GuildMessageCreateEvent
+
+from .config import Config
+
+
+@dataclass(slots=True)
+class MessageFacts:
+    """
+    Dataclass object containing the facts shared by all guild message
+    handlers, determined once per message.
+    """
+
+    authorId: int
+    channelId: int
+    bot: bool
+    system: bool
+    human: bool
+    owner: bool
+    content: Optional[str]
+    lowered: Optional[str]
+    mentions: Set[int]
+
+    @classmethod
+    def From(cls, ctx: GuildMessageCreateEvent, config: Config) -> "MessageFacts":
+        """Determine the shared facts for the provided guild message."""
+
+        content: Optional[str] = ctx.message.content
+
+        return cls(
+            authorId=int(ctx.author_id),
+            channelId=int(ctx.channel_id),
+            bot=ctx.author.is_bot,
+            system=ctx.author.is_system,
+            human=ctx.is_human,
+            owner=int(ctx.author_id) == config.users.owner,
+            content=content,
+            lowered=None if content is None else content.lower(),
+            mentions={int(id) for id in ctx.message.user_mentions_ids},
+        )
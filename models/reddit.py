@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import List, Set
+
+
+@dataclass()
+class RedditImage:
+    """Dataclass object containing a prefetched Reddit image post."""
+
+    title: str
+    permalink: str
+    url: str
+    fetched: float
+
+
+@dataclass()
+class RedditQueue:
+    """Dataclass object containing the cached items of a Reddit queue."""
+
+    order: List[str]
+    seen: Set[str]
+    updated: float
+    synced: float
@@ -0,0 +1,14 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque
+
+
+@dataclass()
+class SourceHealth:
+    """Dataclass object containing the health of an image source."""
+
+    state: str = "closed"
+    failures: int = 0
+    backoff: float = 0.0
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=50))
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=50))
@@ -4,7 +4,6 @@ import os
 from datetime import datetime
 from os import environ
 from sys import exit, stdout
-from typing import Any, Dict
 
 import dotenv
 import tanjun
@@ -15,9 +14,20 @@ from loguru import logger
 from loguru_discord import DiscordSink
 from tanjun import Client
 
-from components import Admin, Animals, Food, Logs, Messages, Raid, Reddit, Roles
-from helpers import Intercept, MenuHooks, SlashHooks
-from models import State
+from components import (
+    Admin,
+    Animals,
+    Dispatch,
+    Food,
+    Logs,
+    Messages,
+    Raid,
+    Reddit,
+    Roles,
+)
+from helpers import Intercept, MenuHooks, SlashHooks, Utility
+from models import Config, State
+from services import Webhooks
 
 
 def Initialize() -> None:
@@ -30,7 +40,7 @@ def Initialize() -> None:
         logger.success("Loaded environment variables")
         logger.trace(environ)
 
-    config: Dict[str, Any] = LoadConfig()
+    config: Config = LoadConfig()
     state: State = State(botStart=datetime.now())
 
     # Reroute standard logging to Loguru
@@ -79,11 +89,14 @@ def Initialize() -> None:
         bot, declare_global_commands=int(environ.get("DISCORD_SERVER_ID"))
     )
 
-    client.set_type_dependency(Dict[str, Any], config)
+    client.set_type_dependency(Config, config)
     client.set_type_dependency(State, state)
     client.set_type_dependency(GatewayBot, bot)
     client.set_type_dependency(Client, client)
 
+    client.add_client_callback(tanjun.ClientCallbackNames.CLOSING, Webhooks.Close)
+    client.add_client_callback(tanjun.ClientCallbackNames.CLOSING, Utility.CloseHTTP)
+
     client.set_slash_hooks(
         (
             tanjun.SlashHooks()
@@ -99,6 +112,7 @@ def Initialize() -> None:
 
     client.add_component(Admin)
     client.add_component(Animals)
+    client.add_component(Dispatch)
     client.add_component(Food)
     client.add_component(Logs)
     client.add_component(Messages)
@@ -113,12 +127,15 @@ def Initialize() -> None:
     )
 
 
-def LoadConfig() -> Dict[str, Any]:
-    """Load the configuration values specified in config.json"""
+def LoadConfig() -> Config:
+    """
+    Load and validate the configuration values specified in config.json,
+    building the immutable lookup indexes used by the event handlers.
+    """
 
     try:
         with open("config.json", "r") as file:
-            config: Dict[str, Any] = json.loads(file.read())
+            config: Config = Config.Parse(json.loads(file.read()))
     except Exception as e:
         logger.opt(exception=e).critical("Failed to load configuration")
 
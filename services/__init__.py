@@ -27,4 +27,8 @@ from .food import (
     Sushi,
     Taco,
 )
+from .joins import Joins
 from .reddit import Reddit
+from .registry import Registry
+from .users import Users
+from .webhooks import Webhooks
@@ -0,0 +1,365 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from io import BufferedWriter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from loguru import logger
+
+
+class Joins:
+    """Class containing the ledger of recent member joins."""
+
+    # Join order ledger of user IDs, join times and account creation
+    # times (milliseconds), sorted by join time.
+    users: array = array("Q")
+    joined: array = array("q")
+    created: array = array("q")
+
+    # Time (milliseconds) from which the ledger is complete
+    since: Optional[int] = None
+
+    # Maximum ledger entries and the number of oldest entries to drop
+    # at once when it is exceeded.
+    capacity: int = 50000
+    trim: int = 10000
+
+    # Append-only join log of packed (user, joined, created) records,
+    # split into numbered segments, see Joins.Open()
+    directory: str = "joins"
+    record: struct.Struct = struct.Struct("<QQQ")
+    segmentSize: int = 16777216
+    segmentLimit: int = 8
+
+    log: Optional[BufferedWriter] = None
+    logPath: Optional[str] = None
+    logLast: int = 0
+
+    # Read-only maps of completed log segments, keyed by path
+    maps: Dict[str, mmap.mmap] = {}
+
+    def Open() -> Optional[int]:
+        """
+        Open the join log for appending, restoring the time from which it
+        is complete. Return the join time of the most recent logged join.
+        """
+
+        last: Optional[int] = None
+
+        try:
+            os.makedirs(Joins.directory, exist_ok=True)
+
+            segments: List[str] = Joins.Segments()
+
+            for path in segments:
+                Joins.Repair(path)
+
+            for path in reversed(segments):
+                if (last := Joins.LastJoin(path)) is not None:
+                    break
+
+            if (len(segments) == 0) or (
+                os.path.getsize(segments[-1]) >= Joins.segmentSize
+            ):
+                segments.append(
+                    Joins.SegmentPath(segments[-1] if len(segments) > 0 else None)
+                )
+
+            Joins.logPath = segments[-1]
+            Joins.log = open(Joins.logPath, "ab")
+            Joins.logLast = last or 0
+        except Exception as e:
+            logger.opt(exception=e).error("Failed to open join log")
+
+            return
+
+        try:
+            with open(os.path.join(Joins.directory, "since"), "r") as file:
+                Joins.since = int(file.read())
+        except FileNotFoundError:
+            logger.debug("Join log is new, no previous joins are known")
+        except Exception as e:
+            logger.opt(exception=e).warning("Failed to restore join log state")
+
+        logger.debug(f"Opened join log {Joins.logPath}")
+
+        return last
+
+    def Start(complete: bool) -> None:
+        """
+        Mark the ledger as complete from the current time onwards, or from
+        the time restored from the join log if no joins were missed since.
+        """
+
+        if (not complete) or (Joins.since is None):
+            Joins.since = Joins.Milliseconds(datetime.now().astimezone())
+
+            Joins.SaveSince()
+
+        logger.debug(f"Started recording member joins (complete from {Joins.since})")
+
+    def Milliseconds(value: datetime) -> int:
+        """Convert the provided datetime object to a Unix timestamp in milliseconds."""
+
+        return int(value.timestamp() * 1000)
+
+    def Record(user: int, joined: datetime, created: datetime) -> None:
+        """Insert a member join into the ledger, keeping it ordered by join time."""
+
+        timestamp: int = Joins.Milliseconds(joined)
+
+        # Joins almost always arrive in order, so this is nearly always
+        # an append.
+        index: int = bisect_right(Joins.joined, timestamp)
+
+        Joins.users.insert(index, user)
+        Joins.joined.insert(index, timestamp)
+        Joins.created.insert(index, Joins.Milliseconds(created))
+
+        Joins.Append(user, timestamp, Joins.Milliseconds(created))
+
+        if len(Joins.joined) <= Joins.capacity:
+            return
+
+        del Joins.users[: Joins.trim]
+        del Joins.joined[: Joins.trim]
+        del Joins.created[: Joins.trim]
+
+        # Trimmed joins remain available from the join log
+        if Joins.log is None:
+            Joins.since = max(Joins.since or 0, Joins.joined[0])
+
+        logger.debug(f"Trimmed {Joins.trim:,} oldest entries from join ledger")
+
+    def Append(user: int, joined: int, created: int) -> None:
+        """Append a member join to the join log, rotating it once it is full."""
+
+        if Joins.log is None:
+            return
+
+        # The log must remain sorted for binary search, so joins that
+        # arrive out of order are logged at the latest join time.
+        Joins.logLast = max(joined, Joins.logLast)
+
+        try:
+            Joins.log.write(Joins.record.pack(user, Joins.logLast, created))
+            Joins.log.flush()
+
+            if Joins.log.tell() >= Joins.segmentSize:
+                Joins.Rotate()
+        except Exception as e:
+            logger.opt(exception=e).error("Failed to append to join log")
+
+    def Rotate() -> None:
+        """Begin a new join log segment and remove the oldest segments."""
+
+        Joins.log.close()
+
+        Joins.logPath = Joins.SegmentPath(Joins.logPath)
+        Joins.log = open(Joins.logPath, "ab")
+
+        segments: List[str] = Joins.Segments()
+
+        for path in segments[: -Joins.segmentLimit]:
+            if (view := Joins.maps.pop(path, None)) is not None:
+                view.close()
+
+            os.remove(path)
+
+            logger.debug(f"Removed join log segment {path}")
+
+        # Joins from removed segments are no longer known
+        if (len(segments) > Joins.segmentLimit) and (
+            (first := Joins.FirstJoin(segments[-Joins.segmentLimit])) is not None
+        ):
+            Joins.since = max(Joins.since or 0, first)
+
+            Joins.SaveSince()
+
+        logger.debug(f"Rotated join log to {Joins.logPath}")
+
+    def Segments() -> List[str]:
+        """Return the paths of the join log segments, oldest first."""
+
+        return sorted(
+            os.path.join(Joins.directory, name)
+            for name in os.listdir(Joins.directory)
+            if name.endswith(".bin")
+        )
+
+    def SegmentPath(previous: Optional[str]) -> str:
+        """Return the path of the join log segment following the provided one."""
+
+        index: int = 0
+
+        if previous:
+            index = int(os.path.basename(previous).split(".")[0]) + 1
+
+        return os.path.join(Joins.directory, f"{index:08}.bin")
+
+    def SaveSince() -> None:
+        """Persist the time from which the ledger is complete."""
+
+        if Joins.log is None:
+            return
+
+        try:
+            with open(os.path.join(Joins.directory, "since"), "w") as file:
+                file.write(str(Joins.since))
+        except Exception as e:
+            logger.opt(exception=e).error("Failed to save join log state")
+
+    def Repair(path: str) -> None:
+        """Remove a partially written trailing record from a join log segment."""
+
+        size: int = os.path.getsize(path)
+
+        if (extra := size % Joins.record.size) == 0:
+            return
+
+        os.truncate(path, size - extra)
+
+        logger.warning(f"Truncated partial record from join log segment {path}")
+
+    def Map(path: str) -> Optional[memoryview]:
+        """
+        Return a zero-copy view of the records in a join log segment as a
+        flat sequence of (user, joined, created) values.
+        """
+
+        if (view := Joins.maps.get(path)) is None:
+            if os.path.getsize(path) == 0:
+                return
+
+            with open(path, "rb") as file:
+                view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            # Segments which are still growing are mapped again on use
+            if len(view) >= Joins.segmentSize:
+                Joins.maps[path] = view
+
+        return memoryview(view).cast("Q")
+
+    def FirstJoin(path: str) -> Optional[int]:
+        """Return the join time of the first record in a join log segment."""
+
+        if (view := Joins.Map(path)) is None:
+            return
+
+        return view[1]
+
+    def LastJoin(path: str) -> Optional[int]:
+        """Return the join time of the last record in a join log segment."""
+
+        if (view := Joins.Map(path)) is None:
+            return
+
+        return view[-2]
+
+    def Sources() -> List[Tuple[Sequence[int], Sequence[int], Sequence[int]]]:
+        """
+        Return the (users, joined, created) columns of the ledger followed
+        by those of each join log segment, newest first. Log records which
+        are also held by the ledger are excluded.
+        """
+
+        sources: List[Tuple[Sequence[int], Sequence[int], Sequence[int]]] = [
+            (Joins.users, Joins.joined, Joins.created)
+        ]
+
+        if Joins.log is None:
+            return sources
+
+        ceiling: Optional[int] = Joins.joined[0] if len(Joins.joined) > 0 else None
+
+        for path in reversed(Joins.Segments()):
+            if (view := Joins.Map(path)) is None:
+                continue
+
+            users: memoryview = view[0::3]
+            joined: memoryview = view[1::3]
+            created: memoryview = view[2::3]
+
+            if ceiling is not None:
+                end: int = bisect_left(joined, ceiling)
+                users, joined, created = users[:end], joined[:end], created[:end]
+
+            sources.append((users, joined, created))
+
+        return sources
+
+    def Collect(
+        now: datetime,
+        amount: Optional[int],
+        maxCreated: Optional[int],
+        maxJoined: Optional[int],
+        newest: Optional[int],
+        newestJoined: Optional[datetime],
+        oldest: Optional[int],
+    ) -> Optional[List[int]]:
+        """
+        Collect the IDs of recently-joined users from the ledger and the
+        join log, newest first. Return None if they do not cover the
+        requested range, in which case the join history must be scanned
+        instead.
+        """
+
+        if Joins.since is None:
+            return
+
+        timestamp: int = Joins.Milliseconds(now)
+        floor: Optional[int] = None
+        createdFloor: Optional[int] = None
+
+        if maxJoined is not None:
+            floor = timestamp - (maxJoined * 1000)
+
+        if maxCreated is not None:
+            createdFloor = timestamp - (maxCreated * 1000)
+
+        users: List[int] = []
+        seen: Set[int] = set()
+        collect: bool = newest is None
+        newestAt: Optional[int] = None
+
+        if newestJoined is not None:
+            newestAt = Joins.Milliseconds(newestJoined)
+
+        # Joins before the ledger became complete may be followed by a gap,
+        # so they are never used, see Joins.Start()
+        lowest: int = Joins.since if floor is None else max(floor, Joins.since)
+
+        for ids, joined, created in Joins.Sources():
+            start: int = bisect_left(joined, lowest)
+            end: int = len(joined)
+
+            # Skip joins newer than newest_join when its join time is known
+            if (not collect) and (newestAt is not None):
+                end = bisect_right(joined, newestAt)
+
+            for index in range(end - 1, start - 1, -1):
+                user: int = ids[index]
+
+                if not collect:
+                    if user != newest:
+                        continue
+
+                    collect = True
+
+                if (createdFloor is None) or (created[index] >= createdFloor):
+                    if user not in seen:
+                        users.append(user)
+                        seen.add(user)
+
+                if user == oldest:
+                    return users
+                elif (amount is not None) and (len(users) >= amount):
+                    return users
+
+        # The complete range was exhausted, which is only conclusive if it
+        # reaches back to the start of the join age window.
+        if (collect) and (floor is not None) and (floor >= Joins.since):
+            return users
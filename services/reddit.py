@@ -1,34 +1,65 @@
 import asyncio
+import random
+from datetime import datetime
 from os import environ
-from typing import Optional
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
 
 import asyncpraw
-from asyncpraw.models.reddit.submission import Submission
+from aiohttp import ClientSession, TCPConnector, TraceConfig, TraceRequestStartParams
 from asyncpraw.models.reddit.subreddit import Subreddit
 from asyncpraw.reddit import Reddit
 from hikari.embeds import Embed
 from loguru import logger
 
 from helpers import Responses, Utility
+from models import RedditImage, RedditQueue
 
 
 class Reddit:
     """Class containing generic Reddit functions."""
 
+    # Long-lived Reddit client, see Reddit.GetClient()
+    session: Optional[Reddit] = None
+    stats: Dict[str, int] = {"uses": 0, "requests": 0, "authentications": 0}
+
+    # Cached queue items and subreddits, see RefreshQueue()
+    queues: Dict[str, RedditQueue] = {}
+    subreddits: Dict[str, Subreddit] = {}
+
+    # Prefetched image posts for each Reddit community, see GetRandomImage()
+    pools: Dict[str, List[RedditImage]] = {}
+    refills: Dict[str, asyncio.Task] = {}
+
+    # Maximum images per pool, refill threshold and image lifetime (seconds)
+    poolSize: int = 100
+    poolLow: int = 10
+    poolTTL: int = 21600
+
     async def CreateClient() -> Optional[Reddit]:
         """Create an authenticated Reddit client using the configured credentials."""
 
+        trace: TraceConfig = TraceConfig()
+        trace.on_request_start.append(Reddit.TraceRequest)
+
         client: Reddit = asyncpraw.Reddit(
             username=environ.get("REDDIT_USERNAME"),
             password=environ.get("REDDIT_PASSWORD"),
             client_id=environ.get("REDDIT_CLIENT_ID"),
             client_secret=environ.get("REDDIT_CLIENT_SECRET"),
             user_agent="https://github.com/EthanC/N31L",
+            requestor_kwargs={
+                "session": ClientSession(
+                    connector=TCPConnector(limit=20), trace_configs=[trace]
+                )
+            },
         )
 
         if client.read_only:
             logger.error("Failed to authenticate with Reddit, client is read-only")
 
+            await Reddit.DestroyClient(client)
+
             return
 
         return client
@@ -41,128 +72,249 @@ class Reddit:
         except Exception as e:
             logger.opt(exception=e).warning("Failed to close Reddit session")
 
-    async def GetSubreddit(client: Reddit, community: str) -> Optional[Subreddit]:
+    async def GetClient() -> Optional[Reddit]:
+        """
+        Return the long-lived Reddit client, creating it if it does not
+        yet exist. Authentication is deferred until the first request and
+        the access token is refreshed automatically once it expires.
+        """
+
+        Reddit.stats["uses"] += 1
+
+        if Reddit.session is None:
+            Reddit.session = await Reddit.CreateClient()
+
+        return Reddit.session
+
+    async def CloseClient() -> None:
+        """Close the long-lived Reddit client and its shared connector."""
+
+        if Reddit.session is None:
+            return
+
+        await Reddit.DestroyClient(Reddit.session)
+
+        Reddit.session = None
+
+        logger.debug("Closed shared Reddit client")
+
+    async def TraceRequest(
+        session: ClientSession, ctx: SimpleNamespace, params: TraceRequestStartParams
+    ) -> None:
+        """Count the requests made by the Reddit client, including OAuth grants."""
+
+        Reddit.stats["requests"] += 1
+
+        if params.url.path.endswith("/api/v1/access_token"):
+            Reddit.stats["authentications"] += 1
+
+            logger.debug(
+                f"Requested Reddit access token ({Reddit.stats['authentications']:,} total)"
+            )
+
+    def AuthStats(since: datetime) -> Dict[str, Any]:
+        """
+        Return the number of Reddit OAuth grants performed and the number
+        of grants saved per hour by reusing the long-lived client.
+        """
+
+        hours: float = max(Utility.Elapsed(datetime.now(), since) / 3600, 1.0)
+        saved: int = max(Reddit.stats["uses"] - Reddit.stats["authentications"], 0)
+
+        return {
+            "authentications": Reddit.stats["authentications"],
+            "requests": Reddit.stats["requests"],
+            "savedPerHour": saved / hours,
+        }
+
+    async def GetSubreddit(
+        client: Reddit, community: str, fetch: bool = True
+    ) -> Optional[Subreddit]:
         """Fetch the subreddit object for the specified Reddit community."""
 
         try:
-            return await client.subreddit(community, fetch=True)
+            return await client.subreddit(community, fetch=fetch)
         except Exception as e:
             logger.opt(exception=e).error(
                 f"Failed to fetch Reddit community r/{community}"
             )
 
-    async def CountModqueue(client: Reddit, community: Subreddit) -> int:
+    async def RefreshQueue(
+        community: Subreddit, name: str, queue: str, limit: int, resync: int
+    ) -> Optional[RedditQueue]:
         """
-        Return the number of items in the moderation queue for the
-        specified Reddit community.
+        Refresh the cached items of the specified queue ("modqueue" or
+        "unmoderated") for the provided Reddit community.
+
+        Items are paged newest-first until a previously seen item is
+        reached, and any known items newer than it have been actioned.
+        The whole queue is walked again once the cache is older than the
+        resync interval, so that older actioned items are also dropped.
         """
 
-        total: int = 0
+        key: str = f"{name}/{queue}"
+        now: float = datetime.now().timestamp()
+        cache: Optional[RedditQueue] = Reddit.queues.get(key)
+        full: bool = (cache is None) or ((now - cache.synced) >= resync)
+        found: List[str] = []
+        stop: Optional[str] = None
 
         try:
-            async for _ in community.mod.modqueue(limit=None):
-                total += 1
+            async for item in getattr(community.mod, queue)(limit=limit + 1):
+                if (not full) and (item.fullname in cache.seen):
+                    stop = item.fullname
+
+                    break
+
+                found.append(item.fullname)
         except Exception as e:
             logger.opt(exception=e).error(
-                f"Failed to count moderation queue in Reddit community r/{community.display_name}"
+                f"Failed to refresh {queue} queue in Reddit community r/{name}"
             )
 
-            return total
+            return cache
+
+        # Without a known item to stop at, the whole queue (or more than
+        # the limit) was walked anyway.
+        if stop is None:
+            cache = RedditQueue(order=found, seen=set(found), updated=now, synced=now)
+        else:
+            cache.order = found + cache.order[cache.order.index(stop) :]
+            cache.seen = set(cache.order)
+            cache.updated = now
 
-        logger.success(
-            f"Fetched moderation queue count ({total:,}) for Reddit community r/{community.display_name}"
+        Reddit.queues[key] = cache
+
+        logger.debug(
+            f"Refreshed {queue} queue ({len(cache.seen):,}, {len(found):,} new) for Reddit community r/{name}"
         )
 
-        return total
+        return cache
 
-    async def CountUnmoderated(client: Reddit, community: Subreddit) -> int:
+    def PopImage(community: str) -> Optional[RedditImage]:
         """
-        Return the number of items in the unmoderated queue for the
+        Remove and return a random, unexpired image from the pool of the
         specified Reddit community.
         """
 
-        total: int = 0
+        pool: List[RedditImage] = Reddit.pools.get(community, [])
+        now: float = datetime.now().timestamp()
 
-        try:
-            async for _ in community.mod.unmoderated(limit=None):
-                total += 1
-        except Exception as e:
-            logger.opt(exception=e).error(
-                f"Failed to count unmoderated queue in Reddit community r/{community.display_name}"
-            )
+        while len(pool) > 0:
+            # Swap the chosen image with the last entry so that it can be
+            # removed in constant time.
+            index: int = random.randrange(len(pool))
+            pool[index], pool[-1] = pool[-1], pool[index]
 
-            return total
+            image: RedditImage = pool.pop()
 
-        logger.success(
-            f"Fetched unmoderated queue count ({total:,}) for Reddit community r/{community.display_name}"
-        )
+            if (now - image.fetched) > Reddit.poolTTL:
+                logger.trace(f"Evicted expired image {image.permalink}")
 
-        return total
+                continue
 
-    async def GetRandomImage(community: str) -> Optional[Embed]:
-        """Fetch a random image from the specified Reddit community."""
+            return image
 
-        client: Optional[Reddit] = await Reddit.CreateClient()
+    async def FillPool(community: str) -> None:
+        """
+        Fetch the hot and top listings of the specified Reddit community
+        in bulk and add any SFW image posts to its pool.
+        """
+
+        client: Optional[Reddit] = await Reddit.GetClient()
 
         if client is None:
             return
 
-        subreddit: Optional[Subreddit] = None
-        post: Optional[Submission] = None
-        valid: bool = False
-        attempts: int = 0
+        now: float = datetime.now().timestamp()
+        fetched: List[RedditImage] = []
 
         try:
-            subreddit = await client.subreddit(community, fetch=True)
-
-            while not valid:
-                if attempts >= 5:
-                    logger.debug(
-                        f"Abandonning search for random image in Reddit community r/{community}, too many attempts"
+            subreddit: Subreddit = await client.subreddit(community)
+
+            for listing in [
+                subreddit.hot(limit=100),
+                subreddit.top(time_filter="month", limit=100),
+            ]:
+                async for post in listing:
+                    if post.domain != "i.redd.it":
+                        continue
+                    elif getattr(post, "post_hint", None) != "image":
+                        continue
+                    elif getattr(post, "over_18", True):
+                        continue
+
+                    fetched.append(
+                        RedditImage(
+                            title=post.title,
+                            permalink=post.permalink,
+                            url=post.url,
+                            fetched=now,
+                        )
                     )
+        except Exception as e:
+            logger.opt(exception=e).error(
+                f"Failed to fill image pool for Reddit community r/{community}"
+            )
 
-                    await Reddit.DestroyClient(client)
+        # Merge into the current pool, as images may have been served
+        # while the listings were being fetched.
+        pool: List[RedditImage] = [
+            image
+            for image in Reddit.pools.get(community, [])
+            if (now - image.fetched) <= Reddit.poolTTL
+        ]
+        known: Set[str] = {image.permalink for image in pool}
+        added: int = 0
 
-                    return
+        for image in fetched:
+            if len(pool) >= Reddit.poolSize:
+                break
+            elif image.permalink in known:
+                continue
 
-                post = await subreddit.random()
+            pool.append(image)
+            known.add(image.permalink)
 
-                attempts += 1
+            added += 1
 
-                if post is None:
-                    logger.warning(
-                        f"Reddit community r/{community} does not support submission randomization"
-                    )
+        Reddit.pools[community] = pool
 
-                    await Reddit.DestroyClient(client)
+        logger.debug(
+            f"Added {added:,} images to pool for Reddit community r/{community} ({len(pool):,} total)"
+        )
 
-                    return
+    async def RefillPool(community: str, wait: bool = False) -> None:
+        """
+        Begin filling the image pool of the specified Reddit community
+        in the background, optionally waiting for it to complete.
+        """
 
-                await post.load()
+        task: Optional[asyncio.Task] = Reddit.refills.get(community)
 
-                if not post.is_reddit_media_domain:
-                    continue
-                elif not hasattr(post, "post_hint"):
-                    continue
-                elif post.post_hint != "image":
-                    continue
-                elif not hasattr(post, "over_18"):
-                    continue
-                elif post.over_18:
-                    continue
+        if task is None:
+            task = asyncio.create_task(Reddit.FillPool(community))
+            task.add_done_callback(lambda _: Reddit.refills.pop(community, None))
 
-                valid = True
+            Reddit.refills[community] = task
 
-            # Sleep to prevent rate-limiting
-            await asyncio.sleep(float(1))
-        except Exception as e:
-            logger.opt(exception=e).error(
-                f"Failed to fetch random image post from Reddit community r/{community}"
-            )
+        if wait:
+            await asyncio.shield(task)
+
+    async def GetRandomImage(community: str) -> Optional[Embed]:
+        """Fetch a random image from the specified Reddit community."""
 
-        await Reddit.DestroyClient(client)
+        if len(Reddit.pools.get(community, [])) == 0:
+            await Reddit.RefillPool(community, True)
+
+        post: Optional[RedditImage] = Reddit.PopImage(community)
+
+        if len(Reddit.pools.get(community, [])) <= Reddit.poolLow:
+            await Reddit.RefillPool(community)
 
         if post is None:
+            logger.debug(f"No images available for Reddit community r/{community}")
+
             return
 
         return Responses.Success(
@@ -0,0 +1,406 @@
+import asyncio
+import random
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from hikari.embeds import Embed
+from loguru import logger
+
+from models import Config, SourceHealth
+
+Source = Callable[[], Awaitable[Optional[Embed]]]
+
+
+class Registry:
+    """Class containing the weighted image sources for each command type."""
+
+    sources: Dict[str, List[Source]] = {}
+    weights: Dict[str, List[float]] = {}
+    defaults: Dict[str, List[float]] = {}
+
+    # Alias method probability and alias tables, see Registry.Build()
+    tables: Dict[str, Tuple[List[float], List[int]]] = {}
+
+    # Recent outcomes, latencies and circuit state of each image source
+    health: Dict[Source, SourceHealth] = {}
+
+    # Consecutive failures to open a circuit and its backoff bounds (seconds)
+    breakerFailures: int = 3
+    breakerBackoff: float = 60.0
+    breakerMaxBackoff: float = 1800.0
+
+    # Prefetched results for each type, see Registry.Produce()
+    buffers: Dict[str, Deque[Embed]] = {}
+    producers: List[asyncio.Task] = []
+    # Wake event of the producer for each type, see Registry.Take()
+    wanted: Dict[str, asyncio.Event] = {}
+
+    # Bounds (seconds) of the hedge deadline, see Registry.Deadline()
+    hedgeDefault: float = 1.0
+    hedgeMin: float = 0.25
+    hedgeMax: float = 3.0
+
+    def Register(type: str, sources: List[Source], weight: float = 1.0) -> None:
+        """Register the provided image sources for the specified type."""
+
+        Registry.sources[type] = list(sources)
+        Registry.weights[type] = [weight] * len(sources)
+        Registry.defaults[type] = [weight] * len(sources)
+        Registry.tables[type] = Registry.Build(Registry.weights[type])
+
+        logger.trace(f"Registered {len(sources):,} image sources for {type}")
+
+    def SetWeight(type: str, source: Source, weight: float) -> None:
+        """
+        Set the selection weight of an image source and rebuild the alias
+        table for its type.
+        """
+
+        index: int = Registry.sources[type].index(source)
+
+        if Registry.weights[type][index] == weight:
+            return
+
+        Registry.weights[type][index] = weight
+        Registry.tables[type] = Registry.Build(Registry.weights[type])
+
+        logger.debug(f"Set weight of {source.__qualname__} for {type} to {weight}")
+
+    def Toggle(source: Source, enabled: bool) -> None:
+        """
+        Take an image source out of, or return it to, rotation for every
+        type that it is registered to.
+        """
+
+        for type, sources in Registry.sources.items():
+            if source not in sources:
+                continue
+
+            index: int = sources.index(source)
+            weight: float = Registry.defaults[type][index] if enabled else 0.0
+
+            Registry.SetWeight(type, source, weight)
+
+    def Build(weights: List[float]) -> Tuple[List[float], List[int]]:
+        """
+        Build the probability and alias tables for the provided weights
+        using Vose's alias method, allowing for O(1) weighted selection.
+        """
+
+        count: int = len(weights)
+        total: float = sum(weights)
+
+        if total <= 0:
+            weights = [1.0] * count
+            total = float(count)
+
+        scaled: List[float] = [(weight * count) / total for weight in weights]
+        probability: List[float] = [1.0] * count
+        alias: List[int] = list(range(count))
+
+        small: List[int] = [i for i, p in enumerate(scaled) if p < 1.0]
+        large: List[int] = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while (len(small) > 0) and (len(large) > 0):
+            less: int = small.pop()
+            more: int = large.pop()
+
+            probability[less] = scaled[less]
+            alias[less] = more
+
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        return probability, alias
+
+    def Pick(type: str) -> Source:
+        """Select a weighted random image source for the specified type."""
+
+        probability, alias = Registry.tables[type]
+        index: int = random.randrange(len(probability))
+
+        if random.random() >= probability[index]:
+            index = alias[index]
+
+        return Registry.sources[type][index]
+
+    def Deadline(source: Source) -> float:
+        """
+        Return the time to wait for the provided image source before
+        hedging, based upon the 95th percentile of its recent latencies.
+        """
+
+        if (p95 := Registry.Percentile(source, 0.95)) is None:
+            return Registry.hedgeDefault
+
+        return min(max(p95, Registry.hedgeMin), Registry.hedgeMax)
+
+    def Percentile(source: Source, percentile: float) -> Optional[float]:
+        """
+        Return the specified percentile of the recent latencies of the
+        provided image source, if enough samples have been recorded.
+        """
+
+        if (health := Registry.health.get(source)) is None:
+            return
+        elif len(health.latencies) < 10:
+            return
+
+        ordered: List[float] = sorted(health.latencies)
+
+        return ordered[min(int(len(ordered) * percentile), len(ordered) - 1)]
+
+    async def Call(source: Source, deadline: Optional[float] = None) -> Optional[Embed]:
+        """
+        Call the provided image source and record its response time. If
+        the call is cancelled after running past the provided deadline,
+        it is recorded as a failure.
+        """
+
+        start: float = datetime.now().timestamp()
+        result: Optional[Embed] = None
+        success: Optional[bool] = None
+
+        try:
+            result = await source()
+            success = result is not None
+        except asyncio.CancelledError:
+            # A stalled source still opens its circuit and gains a deadline,
+            # while a source which merely lost a race only records latency.
+            if (deadline is not None) and (
+                (datetime.now().timestamp() - start) >= deadline
+            ):
+                success = False
+
+            raise
+        except Exception as e:
+            success = False
+
+            logger.opt(exception=e).error(f"Failed to fetch from {source.__qualname__}")
+        finally:
+            Registry.Record(source, datetime.now().timestamp() - start, success)
+
+        return result
+
+    def Record(source: Source, elapsed: float, success: Optional[bool]) -> None:
+        """
+        Record the outcome of an image source call and update its circuit
+        breaker. Sources which repeatedly fail are taken out of rotation
+        for an exponentially increasing backoff window. Calls without an
+        outcome, having been cancelled, only record their latency.
+        """
+
+        if (health := Registry.health.get(source)) is None:
+            health = Registry.health[source] = SourceHealth()
+
+        if success is None:
+            health.latencies.append(elapsed)
+
+            return
+
+        health.outcomes.append(success)
+
+        if success:
+            health.latencies.append(elapsed)
+            health.failures = 0
+
+            if health.state != "closed":
+                health.state = "closed"
+                health.backoff = 0.0
+
+                Registry.Toggle(source, True)
+
+                logger.info(
+                    f"Closed circuit for {source.__qualname__}, source recovered"
+                )
+
+            return
+
+        health.failures += 1
+
+        if health.state == "open":
+            return
+        elif (health.state == "closed") and (
+            health.failures < Registry.breakerFailures
+        ):
+            return
+
+        health.state = "open"
+        health.backoff = min(
+            max(health.backoff * 2, Registry.breakerBackoff),
+            Registry.breakerMaxBackoff,
+        )
+
+        Registry.Toggle(source, False)
+
+        asyncio.get_running_loop().call_later(health.backoff, Registry.HalfOpen, source)
+
+        logger.warning(
+            f"Opened circuit for {source.__qualname__} for {health.backoff:,.0f}s after {health.failures:,} failures"
+        )
+
+    def HalfOpen(source: Source) -> None:
+        """Return an open image source to rotation on a trial basis."""
+
+        if (health := Registry.health.get(source)) is None:
+            return
+        elif health.state != "open":
+            return
+
+        health.state = "half-open"
+
+        Registry.Toggle(source, True)
+
+        logger.info(f"Half-opened circuit for {source.__qualname__}")
+
+    def Stats() -> List[Dict[str, Any]]:
+        """Return the circuit state, error rate and p95 latency of each source."""
+
+        results: List[Dict[str, Any]] = []
+
+        for source, health in Registry.health.items():
+            results.append(
+                {
+                    "name": source.__qualname__,
+                    "state": health.state,
+                    "errorRate": 0.0
+                    if len(health.outcomes) == 0
+                    else health.outcomes.count(False) / len(health.outcomes),
+                    "p95": Registry.Percentile(source, 0.95),
+                }
+            )
+
+        return results
+
+    async def Fetch(type: str) -> Optional[Embed]:
+        """
+        Fetch an image for the specified type. If the chosen source has not
+        answered within its deadline, a second source is raced against it
+        and the first successful result is returned.
+
+        Requests are bounded by the timeout of the shared HTTP client, and
+        the slower source is cancelled once a result is available.
+        """
+
+        first: Source = Registry.Pick(type)
+        deadline: float = Registry.Deadline(first)
+        pending: Set[asyncio.Task] = {
+            asyncio.create_task(Registry.Call(first, deadline))
+        }
+
+        done, pending = await asyncio.wait(pending, timeout=deadline)
+
+        for task in done:
+            if (result := task.result()) is not None:
+                return result
+
+        second: Source = Registry.Pick(type)
+        others: List[Source] = [x for x in Registry.sources[type] if x is not first]
+
+        # Without a different source to hedge with, keep waiting for the first
+        if len(others) == 0:
+            if len(pending) == 0:
+                return
+
+            return await pending.pop()
+        elif second is first:
+            second = random.choice(others)
+
+        logger.debug(f"Hedging {first.__qualname__} with {second.__qualname__}")
+
+        pending.add(asyncio.create_task(Registry.Call(second)))
+
+        try:
+            while len(pending) > 0:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if (result := task.result()) is not None:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def Take(type: str) -> Optional[Embed]:
+        """
+        Remove and return a prefetched result for the specified type, if
+        one is available, and wake its producer to replace it.
+        """
+
+        if (wanted := Registry.wanted.get(type)) is not None:
+            wanted.set()
+
+        if len(buffer := Registry.buffers.get(type, ())) == 0:
+            return
+
+        return buffer.popleft()
+
+    async def Produce(types: List[str], depth: int, concurrency: int) -> None:
+        """
+        Keep the result buffers of the specified types filled, waking when
+        a result is taken or once per minute to retry failed types.
+        """
+
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        wanted: asyncio.Event = asyncio.Event()
+
+        # Each producer owns its event, so that it is only ever cleared by
+        # the producer which waits upon it.
+        for type in types:
+            Registry.wanted[type] = wanted
+
+        async def Fill(type: str) -> None:
+            if (buffer := Registry.buffers.get(type)) is None:
+                buffer = Registry.buffers[type] = deque(maxlen=depth)
+
+            while len(buffer) < depth:
+                async with semaphore:
+                    result: Optional[Embed] = await Registry.Fetch(type)
+
+                if result is None:
+                    logger.debug(f"Failed to prefetch {type}, retrying later")
+
+                    break
+
+                buffer.append(result)
+
+        while True:
+            wanted.clear()
+
+            await asyncio.gather(*[Fill(type) for type in types])
+
+            try:
+                await asyncio.wait_for(wanted.wait(), 60.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def StartProducer(types: List[str], config: Config) -> None:
+        """Begin prefetching results for the specified types in the background."""
+
+        depth: int = config.buffers.depth
+        concurrency: int = config.buffers.concurrency
+
+        Registry.producers.append(
+            asyncio.create_task(Registry.Produce(types, depth, concurrency))
+        )
+
+        logger.debug(
+            f"Started prefetching results for {len(types):,} types (depth {depth:,}, concurrency {concurrency:,})"
+        )
+
+    async def StopProducers() -> None:
+        """Stop all background producers."""
+
+        for task in Registry.producers:
+            task.cancel()
+
+        await asyncio.gather(*Registry.producers, return_exceptions=True)
+
+        Registry.producers = []
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from hikari import NotFoundError, User
+from hikari.api import RESTClient
+from loguru import logger
+
+
+class Users:
+    """Class containing the shared cache of validated Discord user IDs."""
+
+    # Whether each checked ID belongs to a user and when it was checked
+    known: Dict[int, Tuple[bool, float]] = {}
+
+    # Maximum cached IDs and their lifetime (seconds)
+    cacheSize: int = 100000
+    cacheTTL: int = 86400
+
+    # Maximum concurrent user requests per validation
+    concurrency: int = 8
+
+    async def Validate(rest: RESTClient, ids: List[int]) -> List[int]:
+        """
+        Return the provided IDs which belong to Discord users, in order.
+        IDs which are not cached are fetched concurrently.
+        """
+
+        now: float = datetime.now().timestamp()
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(Users.concurrency)
+        results: Dict[int, Optional[bool]] = {id: Users.Cached(id, now) for id in ids}
+        missing: List[int] = [id for id, valid in results.items() if valid is None]
+
+        if len(missing) > 0:
+            checks: List[Optional[bool]] = await asyncio.gather(
+                *[Users.Fetch(rest, id, semaphore) for id in missing]
+            )
+
+            results.update(zip(missing, checks))
+
+        logger.debug(
+            f"Validated {len(ids):,} user IDs ({len(ids) - len(missing):,} cached)"
+        )
+
+        return [id for id in ids if results[id]]
+
+    def Cached(id: int, now: float) -> Optional[bool]:
+        """Return whether the provided ID is a user, or None if it is not cached."""
+
+        if (entry := Users.known.get(id)) is None:
+            return
+        elif (now - entry[1]) > Users.cacheTTL:
+            del Users.known[id]
+
+            return
+
+        return entry[0]
+
+    async def Fetch(
+        rest: RESTClient, id: int, semaphore: asyncio.Semaphore
+    ) -> Optional[bool]:
+        """
+        Determine whether the provided ID is a user and cache the result.
+        Return None if this could not be determined.
+        """
+
+        try:
+            async with semaphore:
+                user: User = await rest.fetch_user(id)
+        except NotFoundError:
+            logger.debug(f"{id} is not a user ID")
+
+            Users.Remember(id, False)
+
+            return False
+        except Exception as e:
+            logger.opt(exception=e).debug(f"Failed to validate user ID {id}")
+
+            return
+
+        logger.debug(f"Validated {id} as user {user.username}")
+
+        Users.Remember(id, True)
+
+        return True
+
+    def Remember(id: int, valid: bool) -> None:
+        """Cache whether the provided ID is a user, evicting the oldest entries if full."""
+
+        Users.known[id] = (valid, datetime.now().timestamp())
+
+        # Dictionaries preserve insertion order, so the first entries
+        # are the oldest.
+        while len(Users.known) > Users.cacheSize:
+            del Users.known[next(iter(Users.known))]
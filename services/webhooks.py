@@ -0,0 +1,222 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from httpx import Response
+from loguru import logger
+
+from helpers import Utility
+
+
+class Webhooks:
+    """Class containing the batched Discord webhook delivery queue."""
+
+    # Pending embeds and the delivery worker for each webhook URL
+    queues: Dict[str, Deque[Dict[str, Any]]] = {}
+    workers: Dict[str, asyncio.Task] = {}
+    wakes: Dict[str, asyncio.Event] = {}
+
+    stats: Dict[str, int] = {
+        "queued": 0,
+        "delivered": 0,
+        "dropped": 0,
+        "failed": 0,
+        "requests": 0,
+        "limited": 0,
+    }
+
+    # Maximum pending embeds per URL, the oldest are dropped beyond this
+    queueSize: int = 500
+
+    # Discord limits for a single webhook execution
+    batchSize: int = 10
+    batchChars: int = 6000
+
+    # Attempts and base backoff (seconds) for server and network errors
+    attempts: int = 3
+    backoff: float = 1.0
+
+    username: str = "N31L"
+    avatar: str = "https://i.imgur.com/cGtkGuI.png"
+
+    def Enqueue(url: Optional[str], embed: Dict[str, Any]) -> None:
+        """
+        Queue the provided embed for delivery to the specified webhook URL,
+        starting the delivery worker for the URL if it is not yet running.
+        """
+
+        if not url:
+            return
+
+        if (queue := Webhooks.queues.get(url)) is None:
+            queue = deque(maxlen=Webhooks.queueSize)
+
+            Webhooks.queues[url] = queue
+            Webhooks.wakes[url] = asyncio.Event()
+
+        if len(queue) == queue.maxlen:
+            Webhooks.stats["dropped"] += 1
+
+            logger.debug("Webhook queue is full, dropped oldest embed")
+
+        queue.append(embed)
+
+        Webhooks.stats["queued"] += 1
+        Webhooks.wakes[url].set()
+
+        if (task := Webhooks.workers.get(url)) is None or task.done():
+            Webhooks.workers[url] = asyncio.create_task(Webhooks.Worker(url))
+
+    def Size(embed: Dict[str, Any]) -> int:
+        """Determine the character count of an embed as measured by Discord."""
+
+        total: int = len(embed.get("title") or "") + len(embed.get("description") or "")
+        total += len((embed.get("footer") or {}).get("text") or "")
+        total += len((embed.get("author") or {}).get("name") or "")
+
+        for field in embed.get("fields") or []:
+            total += len(field.get("name") or "") + len(field.get("value") or "")
+
+        return total
+
+    def Batch(queue: Deque[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Remove and return as many of the oldest queued embeds as fit in a
+        single webhook execution.
+        """
+
+        batch: List[Dict[str, Any]] = []
+        chars: int = 0
+
+        while (len(queue) > 0) and (len(batch) < Webhooks.batchSize):
+            size: int = Webhooks.Size(queue[0])
+
+            if (len(batch) > 0) and ((chars + size) > Webhooks.batchChars):
+                break
+
+            batch.append(queue.popleft())
+            chars += size
+
+        return batch
+
+    async def Worker(url: str) -> None:
+        """Deliver the queued embeds for the specified webhook URL in batches."""
+
+        queue: Deque[Dict[str, Any]] = Webhooks.queues[url]
+        wake: asyncio.Event = Webhooks.wakes[url]
+
+        while True:
+            await wake.wait()
+
+            wake.clear()
+
+            while len(queue) > 0:
+                batch: List[Dict[str, Any]] = Webhooks.Batch(queue)
+                wait: float = await Webhooks.Deliver(url, batch)
+
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+    async def Deliver(url: str, batch: List[Dict[str, Any]]) -> float:
+        """
+        Execute the webhook with the provided embeds and return the number
+        of seconds to wait before the next execution. Rate-limited batches
+        are returned to the front of the queue.
+        """
+
+        payload: Dict[str, Any] = {
+            "username": Webhooks.username,
+            "avatar_url": Webhooks.avatar,
+            "embeds": batch,
+        }
+
+        for attempt in range(Webhooks.attempts):
+            Webhooks.stats["requests"] += 1
+
+            try:
+                async with Utility.HostLimit(url):
+                    res: Response = await Utility.HTTP().post(url, json=payload)
+            except Exception as e:
+                logger.opt(exception=e).debug(f"Failed to POST {url}")
+
+                await asyncio.sleep(Webhooks.backoff * (2**attempt))
+
+                continue
+
+            if res.status_code == 429:
+                Webhooks.stats["limited"] += 1
+
+                queue: Deque[Dict[str, Any]] = Webhooks.queues[url]
+
+                # Requeue ahead of newer embeds, still dropping the oldest
+                # should the queue have filled during the request.
+                if (overflow := len(queue) + len(batch) - queue.maxlen) > 0:
+                    Webhooks.stats["dropped"] += overflow
+
+                    batch = batch[overflow:]
+
+                queue.extendleft(reversed(batch))
+
+                retry: float = Webhooks.RetryAfter(res)
+
+                logger.debug(f"Webhook is rate limited, retrying in {retry:,.2f}s")
+
+                return retry
+            elif res.status_code >= 500:
+                await asyncio.sleep(Webhooks.backoff * (2**attempt))
+
+                continue
+            elif res.is_error:
+                break
+
+            Webhooks.stats["delivered"] += len(batch)
+
+            logger.trace(f"Delivered {len(batch):,} embeds to webhook")
+
+            # Wait out the bucket once it has been exhausted
+            if res.headers.get("X-RateLimit-Remaining") == "0":
+                return float(res.headers.get("X-RateLimit-Reset-After", 0.0))
+
+            return 0.0
+
+        Webhooks.stats["failed"] += len(batch)
+
+        logger.error(f"Failed to deliver {len(batch):,} embeds to webhook")
+
+        return 0.0
+
+    def RetryAfter(res: Response) -> float:
+        """Determine the number of seconds to wait after a rate-limited request."""
+
+        for header in ["Retry-After", "X-RateLimit-Reset-After"]:
+            try:
+                return float(res.headers[header])
+            except (KeyError, ValueError):
+                continue
+
+        try:
+            return float(res.json()["retry_after"])
+        except Exception:
+            return Webhooks.backoff
+
+    def Stats() -> Dict[str, int]:
+        """Return the delivery counters and the number of pending embeds."""
+
+        return {
+            **Webhooks.stats,
+            "pending": sum(len(queue) for queue in Webhooks.queues.values()),
+        }
+
+    async def Close() -> None:
+        """Stop all delivery workers."""
+
+        for task in Webhooks.workers.values():
+            task.cancel()
+
+        await asyncio.gather(*Webhooks.workers.values(), return_exceptions=True)
+
+        Webhooks.workers = {}
+
+        logger.debug(
+            f"Stopped webhook delivery with {Webhooks.Stats()['pending']:,} pending"
+        )